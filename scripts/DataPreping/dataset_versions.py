@@ -0,0 +1,107 @@
+# dataset_versions.py — record, review and compare versions of the labeled dataset
+#
+#   python scripts/DataPreping/dataset_versions.py snapshot            # record what is on disk
+#   python scripts/DataPreping/dataset_versions.py review 001_signer3_32ea09cd... 002_signer7_...
+#   python scripts/DataPreping/dataset_versions.py review --from-file reviewed.txt
+#   python scripts/DataPreping/dataset_versions.py review --version 4   # everything v4 listed
+#   python scripts/DataPreping/dataset_versions.py list
+#   python scripts/DataPreping/dataset_versions.py diff 3 5
+import argparse
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "../../"))
+sys.path.append(os.path.join(PROJECT_ROOT, "scripts", "common"))
+
+from datasetManifest import diff, load_version, read_names, snapshot, version_numbers
+
+
+def describe(version):
+    pairs = version["pairs"]
+    reviewed = [p for p in pairs.values() if p["reviewed"]]
+    val = sum(1 for p in reviewed if p["split"] == "val")
+    return (f"v{version['number']} ({version['id']}) {version['created_at'][:19]}: {len(pairs)} labeled, "
+            f"{len(reviewed)} reviewed ({len(reviewed) - val} train / {val} val)")
+
+
+def print_diff(old, new):
+    added, changed, removed = diff(old, new)
+    label = f"v{old['number']}" if old else "empty"
+    print(f"🔀 {label} → v{new['number']}: +{len(added)} added, ~{len(changed)} changed, -{len(removed)} removed")
+    for mark, names in (("+", added), ("~", changed), ("-", removed)):
+        for name in names[:20]:
+            print(f"   {mark} {name}")
+        if len(names) > 20:
+            print(f"   {mark} ... {len(names) - 20} more")
+
+
+def record(reviewed=(), note=None):
+    previous = load_version()
+    version = snapshot(reviewed, note=note)
+    unknown = sorted(set(reviewed) - version["pairs"].keys())
+    if unknown:
+        print(f"⚠️ {len(unknown)} names have no label and were not marked reviewed: {', '.join(unknown[:5])}"
+              + (" ..." if len(unknown) > 5 else ""))
+    if previous and version["number"] == previous["number"]:
+        print(f"✅ Dataset unchanged since {describe(version)}")
+    else:
+        print(f"📌 Recorded {describe(version)}")
+        print_diff(previous, version)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Versioned manifests of the labeled dataset")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    snap = commands.add_parser("snapshot", help="record the dataset as it is on disk")
+    snap.add_argument("--note", help="free-text note stored with the version")
+
+    review = commands.add_parser("review", help="mark labeled pairs as reviewed and record a version")
+    review.add_argument("names", nargs="*", help="basenames (without extension) to mark reviewed")
+    review.add_argument("--from-file", help="file listing basenames to mark reviewed, one per line")
+    review.add_argument("--version", type=int, help="mark every pair listed in this dataset version")
+    review.add_argument("--note", help="free-text note stored with the version")
+
+    commands.add_parser("list", help="list recorded versions")
+
+    compare = commands.add_parser("diff", help="pairs added/changed/removed between two versions")
+    compare.add_argument("old", type=int, nargs="?", help="older version (default: the one before new)")
+    compare.add_argument("new", type=int, nargs="?", help="newer version (default: latest)")
+    args = parser.parse_args()
+
+    if args.command == "snapshot":
+        record(note=args.note)
+
+    elif args.command == "review":
+        names = [os.path.splitext(name)[0] for name in args.names]
+        if args.from_file:
+            names += read_names(args.from_file)
+        if args.version is not None:
+            batch = load_version(args.version)
+            if batch is None:
+                print(f"❌ No dataset version v{args.version}.")
+                sys.exit(1)
+            names += list(batch["pairs"])
+        if not names:
+            print("❌ Nothing to review — pass names, --from-file PATH or --version N.")
+            sys.exit(1)
+        record(names, note=args.note)
+
+    elif args.command == "list":
+        numbers = version_numbers()
+        if not numbers:
+            print("ℹ️ No dataset versions yet — run `dataset_versions.py snapshot`.")
+        for number in numbers:
+            version = load_version(number)
+            note = f" — {version['note']}" if version.get("note") else ""
+            print(f"📚 {describe(version)}{note}")
+
+    elif args.command == "diff":
+        new = load_version(args.new)
+        if new is None:
+            print("❌ No such version.")
+            sys.exit(1)
+        old_number = args.old if args.old is not None else new["parent"]
+        old = load_version(old_number) if old_number else None
+        print_diff(old, new)
@@ -2,19 +2,23 @@
 # Purpose: Export unmarked images from DB into training/raw for labelImg or pretraining
 
 import os
-import sqlite3
+import sys
 import hashlib
-import requests
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "../../"))
+sys.path.append(os.path.join(PROJECT_ROOT, "scripts", "common"))
+
+from dbHelper import get_connection
+from exportLedger import NOT_EXPORTED, import_legacy_log, record_export
+from imageHashes import export_deduplicated
+from imageStore import ImageStore
 
-DB_PATH = os.path.join(PROJECT_ROOT, "database", "autographs.db")
 EXPORT_DIR = os.path.join(PROJECT_ROOT, "data", "training", "raw")
-EXPORT_LOG = os.path.join(PROJECT_ROOT, "data", "training", "exported_training.txt")
+EXPORT_DESTINATION = "training"
+LEGACY_EXPORT_LOG = os.path.join(PROJECT_ROOT, "data", "training", "exported_training.txt")
 LIMIT = 200
-
-HEADERS = {"User-Agent": "Mozilla/5.0"}
+DOWNLOAD_WORKERS = 16
 
 def sanitize_ext(url):
     ext = os.path.splitext(url)[1].split('?')[0].lower()
@@ -24,52 +28,37 @@ def export_training_images():
     if not os.path.exists(EXPORT_DIR):
         os.makedirs(EXPORT_DIR)
 
-    # Load already-exported URLs
-    exported_urls = set()
-    if os.path.exists(EXPORT_LOG):
-        with open(EXPORT_LOG, "r") as f:
-            exported_urls = set(line.strip() for line in f)
+    with get_connection() as conn:
+        import_legacy_log(conn, LEGACY_EXPORT_LOG, EXPORT_DESTINATION)
 
-    # Get unexported image URLs from DB
-    with sqlite3.connect(DB_PATH) as conn:
+        # Get unexported image URLs from DB
         c = conn.cursor()
-        c.execute("""
-            SELECT MIN(signer_id), img_url
-            FROM autographs
-            WHERE signer_id IS NOT NULL AND img_url IS NOT NULL
-            GROUP BY img_url
-        """)
-        rows = [row for row in c.fetchall() if row[1] not in exported_urls]
-
-        print(f"🧪 Found {len(rows)} unexported images.")
-        to_export = rows[:LIMIT]
-
+        c.execute(f"""
+            SELECT MIN(a.signer_id), a.img_url
+            FROM autographs a
+            WHERE a.signer_id IS NOT NULL AND a.img_url IS NOT NULL
+              AND {NOT_EXPORTED}
+            GROUP BY a.img_url
+            LIMIT ?
+        """, (EXPORT_DESTINATION, LIMIT))
+        to_export = c.fetchall()
+
+        print(f"🧪 Selected {len(to_export)} unexported images.")
+
+        jobs = []
         for i, (signer_id, img_url) in enumerate(to_export):
             if not img_url.startswith("http"):
                 print(f"⚠️ Skipping invalid URL: {img_url}")
+                record_export(conn, EXPORT_DESTINATION, img_url, "invalid")
                 continue
 
-            try:
-                response = requests.get(img_url, headers=HEADERS, stream=True, timeout=10)
-                if response.status_code == 200:
-                    hash_id = hashlib.md5(img_url.encode()).hexdigest()
-                    ext = sanitize_ext(img_url)
-                    filename = f"{i:03d}_signer{signer_id}_{hash_id}{ext}"
-                    filepath = os.path.join(EXPORT_DIR, filename)
-
-                    with open(filepath, "wb") as out:
-                        for chunk in response.iter_content(1024):
-                            out.write(chunk)
-
-                    # Save img_url to log filec.ex
-                    with open(EXPORT_LOG, "a") as f:
-                        f.write(img_url + "\n")
+            hash_id = hashlib.md5(img_url.encode()).hexdigest()
+            ext = sanitize_ext(img_url)
+            filename = f"{i:03d}_signer{signer_id}_{hash_id}{ext}"
+            jobs.append((img_url, os.path.join(EXPORT_DIR, filename)))
 
-                    print(f"✅ Downloaded: {filename}")
-                else:
-                    print(f"❌ Failed to fetch: {img_url} (HTTP {response.status_code})")
-            except Exception as e:
-                print(f"❌ Error fetching {img_url}: {e}")
+        with ImageStore(workers=DOWNLOAD_WORKERS) as store:
+            export_deduplicated(store, conn, jobs, EXPORT_DESTINATION)
 
     print(f"\n🎯 Export complete. Check {EXPORT_DIR}")
 
@@ -1,52 +1,151 @@
+import argparse
 import os
 import shutil
+import sys
+import tarfile
 
 # Root-relative paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "../../"))
+sys.path.append(os.path.join(PROJECT_ROOT, "scripts", "common"))
 
-SOURCE_IMAGES = os.path.join(PROJECT_ROOT, "data", "training", "raw")
-SOURCE_LABELS = os.path.join(PROJECT_ROOT, "data", "training", "labels")
-DEST_IMAGES = os.path.join(PROJECT_ROOT, "yolo_dataset", "train", "images")
-DEST_LABELS = os.path.join(PROJECT_ROOT, "yolo_dataset", "train", "labels")
-
-# Only move label/image pairs up to this filename
-CUTOFF_FILENAME = "2424_signer3_32ea09cdbe50462a0e27038046e3dc47.txt"
-
-# Ensure destination folders exist
-os.makedirs(DEST_IMAGES, exist_ok=True)
-os.makedirs(DEST_LABELS, exist_ok=True)
-
-# Get label basenames and sort them
-label_basenames = sorted(
-    os.path.splitext(f)[0]
-    for f in os.listdir(SOURCE_LABELS)
-    if f.endswith(".txt")
-)
-
-moved = 0
-for name in label_basenames:
-    label_file = name + ".txt"
-
-    # Enforce cutoff
-    if label_file > CUTOFF_FILENAME:
-        break
-
-    label_path = os.path.join(SOURCE_LABELS, label_file)
-    if not os.path.exists(label_path):
-        continue
-
-    # Try to find matching image
-    image_found = False
-    for ext in [".jpg", ".jpeg", ".png", ".webp"]:
-        img_path = os.path.join(SOURCE_IMAGES, name + ext)
-        if os.path.exists(img_path):
-            shutil.copy2(img_path, os.path.join(DEST_IMAGES, name + ext))
-            image_found = True
-            break
-
-    if image_found:
-        shutil.copy2(label_path, os.path.join(DEST_LABELS, label_file))
-        moved += 1
-
-print(f"✅ Exported {moved} labeled image/label pairs to `yolo_dataset/train/`.")
\ No newline at end of file
+from datasetManifest import (load_export_manifest, pair_entries, pair_key, remove_exported,
+                             save_export_manifest, select, snapshot, sync_exported)
+
+DEST_ROOT = os.path.join(PROJECT_ROOT, "yolo_dataset", "train")
+DEST_IMAGES = os.path.join(DEST_ROOT, "images")
+DEST_LABELS = os.path.join(DEST_ROOT, "labels")
+DEST_SHARDS = os.path.join(DEST_ROOT, "shards")
+MANIFEST_PATH = os.path.join(DEST_ROOT, "manifest.json")
+
+# copy: independent files; link: hardlinks (reflink/copy fallback), no extra disk;
+# shards: ~1 GB WebDataset-style tars (<name>.<ext> + <name>.txt per sample) read sequentially
+MODES = ["copy", "link", "shards"]
+SHARD_BYTES = 1 << 30
+
+FICLONE = 0x40049409  # Linux ioctl: share extents copy-on-write (btrfs, xfs)
+
+
+def reflink_or_copy(source, dest):
+    try:
+        import fcntl
+        with open(source, "rb") as src, open(dest, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        shutil.copystat(source, dest)
+    except (ImportError, OSError):
+        shutil.copy2(source, dest)
+
+
+def place(source, dest, mode):
+    if mode == "link":
+        try:
+            os.link(source, dest)
+            return
+        except OSError:
+            reflink_or_copy(source, dest)
+            return
+    shutil.copy2(source, dest)
+
+
+def clear_outputs(manifest):
+    # Switching modes (or --full): remove what the previous export wrote.
+    if manifest["mode"] != "shards":
+        for name, pair in manifest["pairs"].items():
+            remove_exported(DEST_IMAGES, DEST_LABELS, name, pair["image"])
+    for shard in manifest["shards"]:
+        if os.path.exists(os.path.join(DEST_SHARDS, shard)):
+            os.remove(os.path.join(DEST_SHARDS, shard))
+    manifest.update(pairs={}, shards={})
+
+
+def export_shards(entries, signatures, manifest):
+    os.makedirs(DEST_SHARDS, exist_ok=True)
+    pairs, shards = manifest["pairs"], manifest["shards"]
+
+    # A shard is rewritten if any of its samples changed or left the dataset. When there is
+    # something new to write, the newest shard is topped up while it is under the target size,
+    # so small increments don't pile up tiny tars; a run with no changes touches nothing.
+    dirty = {pair["shard"] for name, pair in pairs.items()
+             if name not in entries or pair["sig"] != signatures[name]}
+    pending = [name for name in entries if name not in pairs or pairs[name]["sig"] != signatures[name]]
+    if not dirty and not pending:
+        return 0
+    if pending and shards:
+        last = max(shards)
+        if shards[last]["bytes"] < SHARD_BYTES:
+            dirty.add(last)
+
+    todo = [name for name, entry in entries.items()
+            if name not in pairs or pairs[name]["shard"] in dirty or pairs[name]["sig"] != signatures[name]]
+    for name in [n for n in pairs if n not in entries or pairs[n]["shard"] in dirty]:
+        del pairs[name]
+    for shard in dirty:
+        if os.path.exists(os.path.join(DEST_SHARDS, shard)):
+            os.remove(os.path.join(DEST_SHARDS, shard))
+        del shards[shard]
+    if not todo:
+        return 0
+
+    number = max((int(s[6:12]) for s in shards), default=-1) + 1
+    tar, shard, size = None, None, 0
+
+    def close_shard():
+        tar.close()
+        os.replace(os.path.join(DEST_SHARDS, shard + ".tmp"), os.path.join(DEST_SHARDS, shard))
+        shards[shard] = {"samples": sum(1 for p in pairs.values() if p["shard"] == shard), "bytes": size}
+
+    for name in todo:
+        entry = entries[name]
+        sample_bytes = os.path.getsize(entry.image_path) + os.path.getsize(entry.label_path)
+        if tar is None or size + sample_bytes > SHARD_BYTES:
+            if tar is not None:
+                close_shard()
+            shard, size = f"train-{number:06d}.tar", 0
+            number += 1
+            tar = tarfile.open(os.path.join(DEST_SHARDS, shard + ".tmp"), "w")
+        image = os.path.basename(entry.image_path)
+        tar.add(entry.image_path, arcname=image)
+        tar.add(entry.label_path, arcname=name + ".txt")
+        size += sample_bytes
+        pairs[name] = {"image": image, "sig": signatures[name], "shard": shard}
+    close_shard()
+    return len(todo)
+
+
+def export_yolo_dataset(mode="copy", full=False):
+    os.makedirs(DEST_ROOT, exist_ok=True)
+
+    # Reviewed train-split pairs of the current dataset version; a pair is rewritten only when its
+    # content hash differs from what the manifest says was exported.
+    version = snapshot()
+    names = select(version, reviewed=True, split="train")
+    entries = pair_entries(version, names)
+    signatures = {name: pair_key(version["pairs"][name]) for name in names}
+
+    manifest = load_export_manifest(MANIFEST_PATH, mode=None, shards={})
+    exported_version = manifest.get("dataset_version")
+    if full or manifest["mode"] not in (None, mode):
+        clear_outputs(manifest)
+    manifest["mode"] = mode
+    manifest["dataset_version"] = version["number"]
+
+    if mode == "shards":
+        written = export_shards(entries, signatures, manifest)
+    else:
+        written, _ = sync_exported(entries, signatures, manifest, DEST_IMAGES, DEST_LABELS,
+                                   place=lambda source, dest: place(source, dest, mode))
+    save_export_manifest(MANIFEST_PATH, manifest)
+
+    where = "`yolo_dataset/train/shards/`" if mode == "shards" else "`yolo_dataset/train/`"
+    since = f"v{exported_version} → " if exported_version and exported_version != version["number"] else ""
+    print(f"✅ Exported {len(entries)} reviewed train pairs (dataset {since}v{version['number']}) to {where} "
+          f"({written} written, {len(entries) - written} unchanged).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export reviewed image/label pairs as a YOLO dataset")
+    parser.add_argument("--mode", choices=MODES, default="copy", help="how pairs are written (default: copy)")
+    parser.add_argument("--full", action="store_true", help="ignore the manifest and rewrite everything")
+    args = parser.parse_args()
+
+    export_yolo_dataset(args.mode, args.full)
@@ -0,0 +1,41 @@
+# hash_images.py — compute perceptual hashes for every image in the local store
+# Purpose: fill image_hashes so exports can skip near-duplicate images, and list duplicate groups
+
+import argparse
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "../../"))
+sys.path.append(os.path.join(PROJECT_ROOT, "scripts", "common"))
+
+from dbHelper import get_connection
+from imageHashes import HASH_WORKERS, MAX_DISTANCE, NearDuplicateIndex, hash_missing
+
+
+def report_duplicates(conn, max_distance):
+    index = NearDuplicateIndex(max_distance)
+    groups = {}
+    for content_hash, p, d in conn.execute(
+            "SELECT content_hash, phash, dhash FROM image_hashes WHERE phash IS NOT NULL ORDER BY content_hash"):
+        p, d = int(p, 16), int(d, 16)
+        matches = index.find(p, d)
+        if matches:
+            groups.setdefault(matches[0], []).append(content_hash)
+        else:
+            index.add(content_hash, p, d)
+
+    duplicates = sum(len(members) for members in groups.values())
+    print(f"🪞 {duplicates} images are near-duplicates of {len(groups)} others (distance ≤ {max_distance})")
+    return groups
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hash stored images for near-duplicate detection")
+    parser.add_argument("--workers", type=int, default=HASH_WORKERS, help="hashing processes")
+    parser.add_argument("--max-distance", type=int, default=MAX_DISTANCE, help="Hamming distance for the report")
+    args = parser.parse_args()
+
+    with get_connection() as conn:
+        hash_missing(conn, workers=args.workers)
+        report_duplicates(conn, args.max_distance)
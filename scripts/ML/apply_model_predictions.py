@@ -0,0 +1,283 @@
+# apply_model_predictions.py — pre-label images with an exported autograph detector (CPU, ONNX Runtime)
+# Purpose: write YOLO-format boxes for unlabeled images so review starts from predictions, not blank
+#
+# Images are decoded and letterboxed in a process pool while the model runs on the previous batch.
+# Each image gets <name>.txt in the predictions folder (class cx cy w h, normalized, as labelImg
+# expects) and one JSON line with the confidences in confidences.jsonl. An image that already has
+# a prediction or a human label is skipped, so an interrupted run just picks up where it stopped.
+# An unreadable image gets <name>.error instead and is skipped too, until the image file changes.
+#
+#   python scripts/ML/apply_model_predictions.py --model models/autograph_detector.onnx
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "../../"))
+
+from imagePrep import IMAGE_EXTS, load_letterboxed, to_batch
+from tensorCache import TensorCache
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+MODEL_PATH = os.path.join(PROJECT_ROOT, "models", "autograph_detector.onnx")
+IMAGES_DIR = os.path.join(PROJECT_ROOT, "data", "training", "raw")
+LABELS_DIR = os.path.join(PROJECT_ROOT, "data", "training", "labels")
+PREDICTIONS_DIR = os.path.join(PROJECT_ROOT, "data", "training", "predictions")
+CONFIDENCE_LOG = "confidences.jsonl"
+ERROR_EXT = ".error"
+
+IMAGE_SIZE = 640
+BATCH_SIZE = 8
+CONF_THRESHOLD = 0.25
+IOU_THRESHOLD = 0.45
+MAX_DETECTIONS = 100
+PREP_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+
+def pending_images(images_dir, predictions_dir, labels_dir=None, force=False):
+    """
+    Images in name order that have neither a prediction nor (if labels_dir) a human label,
+    and didn't already fail to decode (unless the image changed since).
+    """
+    done = set()
+    failed = {}
+    for folder in ([predictions_dir] if not force else []) + ([labels_dir] if labels_dir else []):
+        if os.path.isdir(folder):
+            with os.scandir(folder) as entries:
+                for e in entries:
+                    name, ext = os.path.splitext(e.name)
+                    if ext == ".txt":
+                        done.add(name)
+                    elif ext == ERROR_EXT and folder == predictions_dir:
+                        failed[name] = e.stat().st_mtime_ns
+
+    images = {}
+    with os.scandir(images_dir) as entries:
+        for entry in entries:
+            name, ext = os.path.splitext(entry.name)
+            if ext.lower() not in IMAGE_EXTS or name in done or not entry.is_file():
+                continue
+            if name in failed and entry.stat().st_mtime_ns <= failed[name]:
+                continue
+            images.setdefault(name, entry.path)
+    return [images[name] for name in sorted(images)]
+
+
+def decode(output, conf_threshold):
+    """
+    Raw detector output for one image -> (xyxy boxes, scores, class ids) above the threshold.
+    Handles YOLOv8-style (4 + classes, anchors) and YOLOv5-style (anchors, 5 + classes) layouts.
+    """
+    if output.shape[0] < output.shape[1]:
+        output = output.T  # v8: channels first, no objectness column
+        boxes, class_scores = output[:, :4], output[:, 4:]
+    else:
+        boxes, class_scores = output[:, :4], output[:, 5:] * output[:, 4:5]
+
+    class_ids = class_scores.argmax(axis=1)
+    scores = class_scores[np.arange(len(class_scores)), class_ids]
+    keep = scores >= conf_threshold
+    boxes, scores, class_ids = boxes[keep], scores[keep], class_ids[keep]
+
+    cx, cy, w, h = boxes.T
+    return np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1), scores, class_ids
+
+
+def nms(boxes, scores, class_ids, iou_threshold, max_detections=MAX_DETECTIONS):
+    """Greedy per-class NMS; classes are kept apart by offsetting their boxes."""
+    if not len(boxes):
+        return np.empty(0, dtype=int)
+    shifted = boxes + (class_ids * (boxes.max() + 1))[:, None]
+    areas = (shifted[:, 2] - shifted[:, 0]) * (shifted[:, 3] - shifted[:, 1])
+    order = scores.argsort()[::-1]
+
+    keep = []
+    while order.size and len(keep) < max_detections:
+        best, rest = order[0], order[1:]
+        keep.append(best)
+        x1 = np.maximum(shifted[best, 0], shifted[rest, 0])
+        y1 = np.maximum(shifted[best, 1], shifted[rest, 1])
+        x2 = np.minimum(shifted[best, 2], shifted[rest, 2])
+        y2 = np.minimum(shifted[best, 3], shifted[rest, 3])
+        inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+        iou = inter / (areas[best] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=int)
+
+
+def to_yolo(boxes, meta):
+    """Letterboxed xyxy pixels -> normalized (cx, cy, w, h) on the original image."""
+    x1 = np.clip((boxes[:, 0] - meta.pad_x) / meta.scale, 0, meta.width)
+    y1 = np.clip((boxes[:, 1] - meta.pad_y) / meta.scale, 0, meta.height)
+    x2 = np.clip((boxes[:, 2] - meta.pad_x) / meta.scale, 0, meta.width)
+    y2 = np.clip((boxes[:, 3] - meta.pad_y) / meta.scale, 0, meta.height)
+    return np.stack([(x1 + x2) / 2 / meta.width, (y1 + y2) / 2 / meta.height,
+                     (x2 - x1) / meta.width, (y2 - y1) / meta.height], axis=1)
+
+
+def write_prediction(predictions_dir, log, path, detections):
+    name = os.path.splitext(os.path.basename(path))[0]
+    log.write(json.dumps({"image": os.path.basename(path), "boxes": detections}) + "\n")
+    log.flush()
+
+    # The .txt is written last and atomically: its presence means this image is done.
+    label_path = os.path.join(predictions_dir, name + ".txt")
+    with open(label_path + ".tmp", "w") as f:
+        for class_id, cx, cy, w, h, _ in detections:
+            f.write(f"{class_id} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}\n")
+    os.replace(label_path + ".tmp", label_path)
+    if os.path.exists(os.path.join(predictions_dir, name + ERROR_EXT)):
+        os.remove(os.path.join(predictions_dir, name + ERROR_EXT))
+
+
+def write_failure(predictions_dir, log, path, error):
+    # Logged like a prediction, plus a marker so later runs don't decode the same file again.
+    name = os.path.splitext(os.path.basename(path))[0]
+    log.write(json.dumps({"image": os.path.basename(path), "error": error}) + "\n")
+    log.flush()
+    with open(os.path.join(predictions_dir, name + ERROR_EXT), "w") as f:
+        f.write(error + "\n")
+
+
+class Detector:
+    def __init__(self, model_path, threads=None):
+        if ort is None:
+            raise ImportError("apply_model_predictions needs onnxruntime: pip install onnxruntime")
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # Exports with a fixed batch dimension need every batch padded to that size.
+        self.fixed_batch = model_input.shape[0] if isinstance(model_input.shape[0], int) else None
+        self.input_size = model_input.shape[2] if isinstance(model_input.shape[2], int) else None
+
+    def __call__(self, arrays):
+        count = len(arrays)
+        if self.fixed_batch:
+            outputs = []
+            for start in range(0, count, self.fixed_batch):
+                chunk = arrays[start:start + self.fixed_batch]
+                chunk = chunk + [chunk[-1]] * (self.fixed_batch - len(chunk))
+                outputs.append(self.session.run(None, {self.input_name: to_batch(chunk)})[0])
+            return np.concatenate(outputs)[:count]
+        return self.session.run(None, {self.input_name: to_batch(arrays)})[0]
+
+
+def apply_predictions(model_path=MODEL_PATH, images_dir=IMAGES_DIR, predictions_dir=PREDICTIONS_DIR,
+                      labels_dir=LABELS_DIR, image_size=IMAGE_SIZE, batch_size=BATCH_SIZE,
+                      conf_threshold=CONF_THRESHOLD, iou_threshold=IOU_THRESHOLD,
+                      workers=PREP_WORKERS, threads=None, limit=None, force=False, use_cache=False):
+    detector = Detector(model_path, threads)
+    if detector.input_size and detector.input_size != image_size:
+        print(f"ℹ️ Model expects {detector.input_size}px input; using that instead of {image_size}")
+        image_size = detector.input_size
+
+    paths = pending_images(images_dir, predictions_dir, labels_dir, force)[:limit]
+    if not paths:
+        print("✅ Nothing to predict — every image already has a prediction or a label.")
+        return 0
+    print(f"🤖 Predicting {len(paths)} images at {image_size}px, batch {batch_size}, {workers} prep workers")
+
+    # Images already in the tensor cache (scripts/ML/cache_tensors.py) skip decoding entirely.
+    cache = TensorCache(image_size) if use_cache else None
+    os.makedirs(predictions_dir, exist_ok=True)
+    started = time.monotonic()
+    predicted = boxes_written = failed = 0
+
+    with open(os.path.join(predictions_dir, CONFIDENCE_LOG), "a") as log, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        todo = iter(paths)
+        queue = deque()
+
+        def refill():
+            # Keep a couple of batches decoding ahead without holding the whole set in memory.
+            while len(queue) < batch_size * 2 + workers:
+                path = next(todo, None)
+                if path is None:
+                    return
+                name = os.path.splitext(os.path.basename(path))[0]
+                if cache and cache.image_fresh(name, path):
+                    array, meta, _ = cache.get(name)
+                    cached = Future()
+                    cached.set_result((path, array, meta))
+                    queue.append(cached)
+                else:
+                    queue.append(pool.submit(load_letterboxed, path, image_size))
+
+        def flush(batch):
+            nonlocal predicted, boxes_written
+            outputs = detector([array for _, array, _ in batch])
+            for (path, _, meta), output in zip(batch, outputs):
+                boxes, scores, class_ids = decode(output, conf_threshold)
+                keep = nms(boxes, scores, class_ids, iou_threshold)
+                yolo = to_yolo(boxes[keep], meta)
+                detections = [[int(c), *(round(float(v), 6) for v in box), round(float(s), 4)]
+                              for c, box, s in zip(class_ids[keep], yolo, scores[keep])
+                              if box[2] > 0 and box[3] > 0]  # boxes entirely in the padding
+                write_prediction(predictions_dir, log, path, detections)
+                boxes_written += len(detections)
+            predicted += len(batch)
+            elapsed = time.monotonic() - started
+            print(f"✅ {predicted}/{len(paths)} images, {boxes_written} boxes "
+                  f"({predicted / elapsed:.1f} images/s)")
+
+        refill()
+        batch = []
+        while queue:
+            path, array, meta = queue.popleft().result()
+            refill()
+            if array is None:
+                print(f"⚠️ Skipping unreadable image {os.path.basename(path)}: {meta}")
+                write_failure(predictions_dir, log, path, meta)
+                failed += 1
+                continue
+            batch.append((path, array, meta))
+            if len(batch) == batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+
+    print(f"\n🎯 Predictions for {predicted} images written to {predictions_dir} "
+          f"in {time.monotonic() - started:.1f}s")
+    if failed:
+        print(f"⚠️ {failed} unreadable images marked with {ERROR_EXT} files; they are retried once replaced")
+    return predicted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-label images with an ONNX autograph detector")
+    parser.add_argument("--model", default=MODEL_PATH, help="exported detector (.onnx)")
+    parser.add_argument("--images", default=IMAGES_DIR, help="folder of images to label")
+    parser.add_argument("--out", default=PREDICTIONS_DIR, help="folder for YOLO .txt predictions")
+    parser.add_argument("--labels", default=LABELS_DIR,
+                        help="skip images already labeled here (pass '' to predict everything)")
+    parser.add_argument("--imgsz", type=int, default=IMAGE_SIZE, help="model input size")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="images per inference call")
+    parser.add_argument("--conf", type=float, default=CONF_THRESHOLD, help="minimum confidence")
+    parser.add_argument("--iou", type=float, default=IOU_THRESHOLD, help="NMS IoU threshold")
+    parser.add_argument("--workers", type=int, default=PREP_WORKERS, help="decode/letterbox processes")
+    parser.add_argument("--threads", type=int, help="ONNX Runtime intra-op threads (default: all cores)")
+    parser.add_argument("--limit", type=int, help="predict at most this many images")
+    parser.add_argument("--force", action="store_true", help="re-predict images that already have predictions")
+    parser.add_argument("--cache", action="store_true", help="read letterboxed images from the tensor cache when fresh")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        print(f"❌ Model not found: {args.model}")
+        sys.exit(1)
+
+    apply_predictions(args.model, args.images, args.out, args.labels or None, args.imgsz, args.batch,
+                      args.conf, args.iou, args.workers, args.threads, args.limit, args.force, args.cache)
@@ -0,0 +1,27 @@
+# cache_tensors.py — decode + letterbox data/training/raw once into the memory-mapped tensor cache
+# Purpose: later inference/evaluation passes read cached slices instead of decoding JPEGs again
+#
+#   python scripts/ML/cache_tensors.py --imgsz 640
+import argparse
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "../../"))
+sys.path.append(os.path.join(PROJECT_ROOT, "scripts", "common"))
+
+from datasetIndex import load_index
+from tensorCache import IMAGE_SIZE, PREP_WORKERS, TensorCache
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build/refresh the letterboxed tensor cache for data/training")
+    parser.add_argument("--imgsz", type=int, default=IMAGE_SIZE, help="model input size")
+    parser.add_argument("--workers", type=int, default=PREP_WORKERS, help="decode/letterbox processes")
+    parser.add_argument("--refresh", action="store_true", help="rescan labels edited in place")
+    args = parser.parse_args()
+
+    index = load_index(refresh=args.refresh)
+    cache = TensorCache(args.imgsz)
+    # Images removed from data/training free their slots for new ones.
+    cache.update([(e.name, e.image_path, e.label_path) for e in index.values()],
+                 workers=args.workers, prune=True)
@@ -0,0 +1,47 @@
+# imagePrep.py — decode + letterbox images to the detector's square input size
+#
+# Runs in worker processes, so everything here is a plain top-level function returning
+# picklable values. Images stay uint8 HWC until they are batched; float conversion
+# happens once per batch in the parent.
+from collections import namedtuple
+
+import numpy as np
+from PIL import Image
+
+IMAGE_EXTS = [".jpg", ".jpeg", ".png", ".webp"]
+PAD_VALUE = 114  # YOLO's grey letterbox padding
+
+# scale and pad map letterboxed pixel coordinates back to the original image.
+Letterbox = namedtuple("Letterbox", "width height scale pad_x pad_y")
+
+
+def letterbox(image, size):
+    """PIL image -> (size x size x 3 uint8 array, Letterbox) keeping the aspect ratio."""
+    image = image.convert("RGB")
+    width, height = image.size
+    scale = min(size / width, size / height)
+    new_w, new_h = max(1, round(width * scale)), max(1, round(height * scale))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+
+    canvas = np.full((size, size, 3), PAD_VALUE, dtype=np.uint8)
+    resized = image.resize((new_w, new_h), Image.Resampling.BILINEAR)
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = np.asarray(resized)
+    return canvas, Letterbox(width, height, scale, pad_x, pad_y)
+
+
+def load_letterboxed(path, size):
+    """(path, array, Letterbox) or (path, None, error message) for unreadable files."""
+    try:
+        with Image.open(path) as image:
+            width, height = image.size
+            image.draft("RGB", (size, size))  # JPEG: decode at reduced scale when it is much larger
+            array, meta = letterbox(image, size)
+        # Report geometry against the original pixels, not the reduced decode.
+        return path, array, meta._replace(width=width, height=height, scale=meta.scale * meta.width / width)
+    except Exception as e:
+        return path, None, str(e)
+
+
+def to_batch(arrays):
+    """uint8 HWC arrays -> float32 NCHW in [0, 1]."""
+    return np.ascontiguousarray(np.stack(arrays).transpose(0, 3, 1, 2), dtype=np.float32) / 255.0
@@ -0,0 +1,185 @@
+# tensorCache.py — letterboxed images cached once in memory-mapped .npy shards
+#
+# Each shard is a fixed-stride uint8 array (capacity, size, size, 3), so an image is one slot
+# and reading it back is a zero-copy slice of the memmap. The index (index.pkl) maps basename
+# -> slot plus the source image/label mtimes, the letterbox geometry and the label boxes in
+# letterboxed coordinates. An entry is stale as soon as its image or label changes.
+import os
+import pickle
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from imagePrep import load_letterboxed
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "../../"))
+CACHE_ROOT = os.path.join(PROJECT_ROOT, "data", "cache", "tensors")
+
+IMAGE_SIZE = 640
+SHARD_CAPACITY = 512  # ~630 MB per shard at 640px
+PREP_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+SAVE_EVERY = 256      # index checkpoint interval while building
+LOOKAHEAD_PER_WORKER = 4  # decoded images allowed in flight per worker
+INDEX_VERSION = 1
+
+# boxes: [[class, cx, cy, w, h], ...] normalized to the letterboxed image; None without a label.
+CacheEntry = namedtuple("CacheEntry", "shard slot image_path image_mtime label_mtime meta boxes")
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns if path else None
+    except FileNotFoundError:
+        return None
+
+
+def letterbox_labels(label_path, meta, size):
+    """YOLO labels on the original image -> the same boxes normalized to the letterboxed image."""
+    boxes = []
+    with open(label_path, "r") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) < 5:
+                continue
+            class_id, cx, cy, w, h = int(parts[0]), *map(float, parts[1:5])
+            boxes.append([
+                class_id,
+                (cx * meta.width * meta.scale + meta.pad_x) / size,
+                (cy * meta.height * meta.scale + meta.pad_y) / size,
+                w * meta.width * meta.scale / size,
+                h * meta.height * meta.scale / size,
+            ])
+    return boxes
+
+
+class TensorCache:
+    def __init__(self, size=IMAGE_SIZE, cache_dir=None, shard_capacity=SHARD_CAPACITY):
+        self.size = size
+        self.cache_dir = cache_dir or os.path.join(CACHE_ROOT, str(size))
+        self.index_path = os.path.join(self.cache_dir, "index.pkl")
+        self.shard_capacity = shard_capacity
+        self.entries = {}
+        self.free = []        # (shard, slot) released by removed images
+        self.next_slot = 0    # first never-used global slot
+        self._shards = {}
+        self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "rb") as f:
+            index = pickle.load(f)
+        if index.get("version") != INDEX_VERSION or index.get("size") != self.size:
+            print(f"⚠️ Tensor cache index at {self.index_path} is from another version/size; starting over")
+            return
+        self.shard_capacity = index["shard_capacity"]
+        self.entries, self.free, self.next_slot = index["entries"], index["free"], index["next_slot"]
+
+    def save_index(self):
+        for shard in self._shards.values():
+            shard.flush()  # pixels first, so the index never points at unwritten slots
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"version": INDEX_VERSION, "size": self.size, "shard_capacity": self.shard_capacity,
+                         "entries": self.entries, "free": self.free, "next_slot": self.next_slot},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.index_path)
+
+    def _shard(self, number, create=False):
+        if create and number in self._shards and not self._shards[number].flags.writeable:
+            del self._shards[number]  # opened read-only by get(); reopen for writing
+        if number not in self._shards:
+            path = os.path.join(self.cache_dir, f"shard_{number:04d}.npy")
+            if create and not os.path.exists(path):
+                os.makedirs(self.cache_dir, exist_ok=True)
+                self._shards[number] = np.lib.format.open_memmap(
+                    path, mode="w+", dtype=np.uint8, shape=(self.shard_capacity, self.size, self.size, 3))
+            else:
+                self._shards[number] = np.load(path, mmap_mode="r+" if create else "r")
+        return self._shards[number]
+
+    def is_fresh(self, name, image_path, label_path=None):
+        entry = self.entries.get(name)
+        return (entry is not None
+                and entry.image_mtime == _mtime(image_path)
+                and entry.label_mtime == _mtime(label_path))
+
+    def image_fresh(self, name, image_path):
+        """Pixels are current (labels not checked) — enough for inference."""
+        entry = self.entries.get(name)
+        return entry is not None and entry.image_mtime == _mtime(image_path)
+
+    def get(self, name):
+        """(zero-copy uint8 HWC view, Letterbox, boxes) for a cached image, or None."""
+        entry = self.entries.get(name)
+        if entry is None:
+            return None
+        return self._shard(entry.shard)[entry.slot], entry.meta, entry.boxes
+
+    def _allocate(self, name):
+        old = self.entries.get(name)
+        if old:
+            return old.shard, old.slot
+        if self.free:
+            return self.free.pop()
+        slot = self.next_slot
+        self.next_slot += 1
+        return divmod(slot, self.shard_capacity)
+
+    def update(self, items, workers=PREP_WORKERS, prune=False):
+        """
+        items: (name, image_path, label_path or None). Re-prepares stale or missing entries;
+        with prune=True, entries not in `items` are dropped and their slots reused.
+        """
+        items = [(name, image, label) for name, image, label in items if image]
+        if prune:
+            keep = {name for name, _, _ in items}
+            for name in [n for n in self.entries if n not in keep]:
+                entry = self.entries.pop(name)
+                self.free.append((entry.shard, entry.slot))
+
+        stale = [(name, image, label) for name, image, label in items
+                 if not self.is_fresh(name, image, label)]
+        if not stale:
+            self.save_index()
+            print(f"✅ Tensor cache up to date ({len(self.entries)} images)")
+            return 0
+
+        print(f"🧊 Caching {len(stale)} images at {self.size}px with {workers} workers "
+              f"({len(items) - len(stale)} already cached)")
+        written = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # A few images per worker in flight, so decoded arrays never pile up ahead of the writes.
+            todo = iter(stale)
+            queue = deque()
+
+            def refill():
+                while len(queue) < workers * LOOKAHEAD_PER_WORKER:
+                    item = next(todo, None)
+                    if item is None:
+                        return
+                    queue.append((item, pool.submit(load_letterboxed, item[1], self.size)))
+
+            refill()
+            while queue:
+                (name, image, label), future = queue.popleft()
+                _, array, meta = future.result()
+                refill()
+                if array is None:
+                    print(f"⚠️ Skipping unreadable image {os.path.basename(image)}: {meta}")
+                    continue
+                shard, slot = self._allocate(name)
+                self._shard(shard, create=True)[slot] = array
+                boxes = letterbox_labels(label, meta, self.size) if label else None
+                self.entries[name] = CacheEntry(shard, slot, image, _mtime(image), _mtime(label), meta, boxes)
+                written += 1
+                if written % SAVE_EVERY == 0:
+                    self.save_index()
+                    print(f"✅ {written}/{len(stale)} cached")
+
+        self.save_index()
+        print(f"🏁 Cached {written} images; {len(self.entries)} in {self.cache_dir}")
+        return written
@@ -1,45 +1,32 @@
 import os
 import shutil
+import sys
 
 # Configuration
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "../../"))
+sys.path.append(os.path.join(PROJECT_ROOT, "scripts", "common"))
+
+from datasetManifest import pair_entries, select, snapshot
 
-SOURCE_IMAGES = os.path.join(PROJECT_ROOT, "data", "training", "raw")
-SOURCE_LABELS = os.path.join(PROJECT_ROOT, "data", "training", "labels")
 DEST_IMAGES = os.path.join(PROJECT_ROOT, "data", "unseen_eval", "images")
 
-CUTOFF_FILENAME = "2424_signer3_32ea09cdbe50462a0e27038046e3dc47.txt"
-SAMPLE_AFTER = 100  # number of post-cutoff examples to copy
+SAMPLE_AFTER = 100  # number of not-yet-reviewed examples to copy
 
 # Ensure destination exists
 os.makedirs(DEST_IMAGES, exist_ok=True)
 
-# Sort all label filenames
-label_files = sorted(
-    f for f in os.listdir(SOURCE_LABELS)
-    if f.endswith(".txt")
-)
-
-# Find index just after the cutoff
-try:
-    cutoff_index = label_files.index(CUTOFF_FILENAME)
-except ValueError:
-    print(f"❌ Cutoff file {CUTOFF_FILENAME} not found.")
+# Labeled pairs the current dataset version doesn't mark as reviewed, in name order
+version = snapshot()
+unreviewed = select(version, reviewed=False)
+if not unreviewed:
+    print(f"❌ Every labeled pair in dataset v{version['number']} is already reviewed.")
     exit(1)
 
-post_cutoff_files = label_files[cutoff_index + 1:cutoff_index + 1 + SAMPLE_AFTER]
 exported = 0
 
-for label_file in post_cutoff_files:
-    base = os.path.splitext(label_file)[0]
-
-    # Look for matching image
-    for ext in [".jpg", ".jpeg", ".png", ".webp"]:
-        img_path = os.path.join(SOURCE_IMAGES, base + ext)
-        if os.path.exists(img_path):
-            shutil.copy2(img_path, os.path.join(DEST_IMAGES, base + ext))
-            exported += 1
-            break  # found image, no need to check more extensions
+for entry in pair_entries(version, unreviewed[:SAMPLE_AFTER]).values():
+    shutil.copy2(entry.image_path, os.path.join(DEST_IMAGES, os.path.basename(entry.image_path)))
+    exported += 1
 
 print(f"🔎 Exported {exported} unseen images to `data/unseen_eval/images/` for inference.")
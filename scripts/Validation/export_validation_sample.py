@@ -1,43 +1,31 @@
 import os
-import shutil
-import random
+import sys
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "../../"))
+sys.path.append(os.path.join(PROJECT_ROOT, "scripts", "common"))
 
-SOURCE_IMAGES = os.path.join(PROJECT_ROOT, "data", "training", "raw")
-SOURCE_LABELS = os.path.join(PROJECT_ROOT, "data", "training", "labels")
-DEST_IMAGES = os.path.join(PROJECT_ROOT, "data", "test_training", "images")
-DEST_LABELS = os.path.join(PROJECT_ROOT, "data", "test_training", "labels")
-SAMPLE_SIZE = 100
+from datasetManifest import (load_export_manifest, pair_entries, pair_key, save_export_manifest, select,
+                             snapshot, sync_exported)
 
-os.makedirs(DEST_IMAGES, exist_ok=True)
-os.makedirs(DEST_LABELS, exist_ok=True)
+DEST_ROOT = os.path.join(PROJECT_ROOT, "data", "test_training")
+DEST_IMAGES = os.path.join(DEST_ROOT, "images")
+DEST_LABELS = os.path.join(DEST_ROOT, "labels")
+# What this script exported last time; only those files are ever removed or replaced
+MANIFEST_PATH = os.path.join(DEST_ROOT, "manifest.json")
 
-# Collect all labeled image base names
-label_basenames = [
-    os.path.splitext(f)[0]
-    for f in os.listdir(SOURCE_LABELS)
-    if f.endswith(".txt")
-]
+os.makedirs(DEST_ROOT, exist_ok=True)
 
-sampled = random.sample(label_basenames, min(SAMPLE_SIZE, len(label_basenames)))
-copied = 0
+# The validation set is the reviewed val split: whole signers, chosen by hash, never in training
+version = snapshot()
+names = select(version, reviewed=True, split="val")
+entries = pair_entries(version, names)
+signatures = {name: pair_key(version["pairs"][name]) for name in names}
 
-for name in sampled:
-    image_found = False
-    for ext in [".jpg", ".jpeg", ".png", ".webp"]:
-        img_path = os.path.join(SOURCE_IMAGES, name + ext)
-        if os.path.exists(img_path):
-            shutil.copy2(img_path, os.path.join(DEST_IMAGES, name + ext))
-            image_found = True
-            break
+manifest = load_export_manifest(MANIFEST_PATH)
+copied, removed = sync_exported(entries, signatures, manifest, DEST_IMAGES, DEST_LABELS)
+manifest["dataset_version"] = version["number"]
+save_export_manifest(MANIFEST_PATH, manifest)
 
-    label_path = os.path.join(SOURCE_LABELS, name + ".txt")
-    if os.path.exists(label_path):
-        shutil.copy2(label_path, os.path.join(DEST_LABELS, name + ".txt"))
-
-    if image_found:
-        copied += 1
-
-print(f"🔎 Exported {copied} labeled image/label pairs to `test_training/` for validation.")
\ No newline at end of file
+print(f"🔎 Validation split of dataset v{version['number']}: {len(entries)} image/label pairs in `test_training/` "
+      f"({copied} copied, {removed} no longer in the split removed).")
@@ -0,0 +1,113 @@
+# datasetIndex.py — one-pass index of data/training images and labels
+#
+# Maps each basename to its image, its label and the label's box count, using one os.scandir per
+# directory instead of listdir + an exists() check per extension. The index is cached next to
+# the data and reused as long as neither directory's mtime has changed; on a rescan only labels
+# whose mtime or size changed are re-read.
+import os
+import pickle
+from collections import namedtuple
+
+from dbHelper import PROJECT_ROOT
+
+TRAINING_DIR = os.path.join(PROJECT_ROOT, "data", "training")
+IMAGES_DIR = os.path.join(TRAINING_DIR, "raw")
+LABELS_DIR = os.path.join(TRAINING_DIR, "labels")
+CACHE_PATH = os.path.join(TRAINING_DIR, ".dataset_index.pkl")
+IMAGE_EXTS = [".jpg", ".jpeg", ".png", ".webp"]  # preferred first when a name has several
+CACHE_VERSION = 1
+
+# boxes is None when there is no label; mtime is the newer of the image and label.
+DatasetEntry = namedtuple("DatasetEntry", "name image_path label_path boxes mtime")
+
+
+def _dir_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _scan(path, exts):
+    """{basename: (path, mtime_ns, size)} for files with one of `exts`, in one scandir pass."""
+    found = {}
+    if not os.path.isdir(path):
+        return found
+    with os.scandir(path) as entries:
+        for entry in entries:
+            name, ext = os.path.splitext(entry.name)
+            ext = ext.lower()
+            if ext not in exts or not entry.is_file():
+                continue
+            if name in found and exts.index(ext) >= exts.index(os.path.splitext(found[name][0])[1].lower()):
+                continue
+            stat = entry.stat()
+            found[name] = (entry.path, stat.st_mtime_ns, stat.st_size)
+    return found
+
+
+def count_boxes(label_path):
+    with open(label_path, "r") as f:
+        return sum(1 for line in f if line.strip())
+
+
+def _read_cache(cache_path):
+    try:
+        with open(cache_path, "rb") as f:
+            cached = pickle.load(f)
+        return cached if cached.get("version") == CACHE_VERSION else None
+    except Exception:
+        return None
+
+
+def _write_cache(cache_path, cached):
+    tmp_path = cache_path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"⚠️ Could not write dataset index cache: {e}")
+
+
+def load_index(images_dir=IMAGES_DIR, labels_dir=LABELS_DIR, cache_path=CACHE_PATH, refresh=False):
+    """
+    {basename: DatasetEntry} for every name with an image or a label, sorted by name.
+    Pass refresh=True after editing labels in place (that doesn't touch the directory mtime).
+    """
+    key = (os.path.abspath(images_dir), _dir_mtime(images_dir),
+           os.path.abspath(labels_dir), _dir_mtime(labels_dir))
+    cached = _read_cache(cache_path)
+    if cached and cached["key"] == key and not refresh:
+        return cached["entries"]
+
+    old_labels = cached["labels"] if cached else {}
+    images = _scan(images_dir, IMAGE_EXTS)
+    labels = _scan(labels_dir, [".txt"])
+
+    label_info = {}
+    for name, (path, mtime, size) in labels.items():
+        old = old_labels.get(name)
+        boxes = old[2] if old and old[:2] == (mtime, size) else count_boxes(path)
+        label_info[name] = (mtime, size, boxes)
+
+    entries = {}
+    for name in sorted(images.keys() | labels.keys()):
+        image = images.get(name)
+        label = labels.get(name)
+        mtimes = [info[1] for info in (image, label) if info]
+        entries[name] = DatasetEntry(
+            name,
+            image[0] if image else None,
+            label[0] if label else None,
+            label_info[name][2] if label else None,
+            max(mtimes) / 1e9,
+        )
+
+    _write_cache(cache_path, {"version": CACHE_VERSION, "key": key, "labels": label_info, "entries": entries})
+    return entries
+
+
+def labeled_entries(index):
+    """Entries that have a label file, in name order."""
+    return [entry for entry in index.values() if entry.label_path]
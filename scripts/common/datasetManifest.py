@@ -0,0 +1,230 @@
+# datasetManifest.py — numbered, content-hashed versions of the labeled dataset
+#
+# A version (data/training/versions/v0001.json, ...) lists every labeled pair with the sha256 of
+# its image and label, its box count, whether it has been reviewed and its train/val split.
+# snapshot() only writes a new version when that content changes, and only re-hashes files whose
+# mtime moved since the previous one. Splits are a hash of the signer id parsed from the filename,
+# so a signer's images always land on the same side and the split never depends on run order.
+#
+# The export scripts share sync_exported(): each keeps an export manifest of the pairs it wrote,
+# rewrites only pairs whose content changed and never removes files it didn't write.
+import hashlib
+import json
+import os
+import re
+import shutil
+from datetime import datetime, timezone
+
+from datasetIndex import IMAGES_DIR, LABELS_DIR, TRAINING_DIR, DatasetEntry, labeled_entries, load_index
+from imageStore import file_hash
+
+VERSIONS_DIR = os.path.join(TRAINING_DIR, "versions")
+EXPORT_MANIFEST_VERSION = 1
+VAL_FRACTION = 0.1
+SPLIT_SALT = "autographreader-split-v1"
+SIGNER_RE = re.compile(r"_signer(\d+)_")
+
+# Labels reviewed before versions existed, one basename per line; only seeds the first version.
+# Export names restart their index every run, so review status is never inferred from name order.
+LEGACY_REVIEWED_PATH = os.path.join(TRAINING_DIR, "legacy_reviewed.txt")
+
+
+def read_names(path):
+    """Basenames (extension stripped) listed one per line in `path`; blank lines and # comments skipped."""
+    with open(path, "r") as f:
+        lines = [line.split("#", 1)[0].strip() for line in f]
+    return [os.path.splitext(line)[0] for line in lines if line]
+
+
+def split_group(name):
+    match = SIGNER_RE.search(name)
+    return f"signer{match.group(1)}" if match else name
+
+
+def assign_split(name, val_fraction=VAL_FRACTION):
+    digest = hashlib.sha256(f"{SPLIT_SALT}:{split_group(name)}".encode("utf-8")).digest()
+    return "val" if int.from_bytes(digest[:8], "big") / 2 ** 64 < val_fraction else "train"
+
+
+def pair_key(pair):
+    """Content of a pair: changes whenever the image or label bytes do."""
+    return f"{pair['image_sha']}:{pair['label_sha']}"
+
+
+def version_id(pairs):
+    digest = hashlib.sha256()
+    for name in sorted(pairs):
+        pair = pairs[name]
+        digest.update(f"{name}\0{pair['image']}\0{pair_key(pair)}\0{pair['reviewed']}\0{pair['split']}\n"
+                      .encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _version_path(number):
+    return os.path.join(VERSIONS_DIR, f"v{number:04d}.json")
+
+
+def version_numbers():
+    if not os.path.isdir(VERSIONS_DIR):
+        return []
+    return sorted(int(f[1:5]) for f in os.listdir(VERSIONS_DIR) if re.fullmatch(r"v\d{4}\.json", f))
+
+
+def load_version(number=None):
+    """A stored version (the latest when number is None), or None if there are none yet."""
+    numbers = version_numbers()
+    if number is None:
+        number = numbers[-1] if numbers else None
+    if number is None or number not in numbers:
+        return None
+    with open(_version_path(number), "r") as f:
+        return json.load(f)
+
+
+def _current_pairs(parent, val_fraction, refresh=True):
+    old = parent["pairs"] if parent else {}
+    legacy = set()
+    if not parent and os.path.exists(LEGACY_REVIEWED_PATH):
+        legacy = set(read_names(LEGACY_REVIEWED_PATH))
+    pairs = {}
+    for entry in labeled_entries(load_index(refresh=refresh)):
+        image = os.path.basename(entry.image_path) if entry.image_path else None
+        previous = old.get(entry.name)
+        if previous and previous["image"] == image and previous["mtime"] == entry.mtime:
+            image_sha, label_sha = previous["image_sha"], previous["label_sha"]
+        else:
+            image_sha = file_hash(entry.image_path) if entry.image_path else None
+            label_sha = file_hash(entry.label_path)
+        pairs[entry.name] = {
+            "image": image,
+            "image_sha": image_sha,
+            "label_sha": label_sha,
+            "boxes": entry.boxes,
+            "mtime": entry.mtime,
+            "reviewed": previous["reviewed"] if previous else entry.name in legacy,
+            "split": assign_split(entry.name, val_fraction),
+        }
+    return pairs
+
+
+def snapshot(reviewed=(), val_fraction=VAL_FRACTION, note=None):
+    """
+    Record the dataset as it is on disk, marking the `reviewed` names as reviewed. Returns the new
+    version, or the latest one unchanged when nothing about the pairs differs.
+    """
+    parent = load_version()
+    pairs = _current_pairs(parent, val_fraction)
+    for name in set(reviewed) & pairs.keys():
+        pairs[name]["reviewed"] = True
+
+    content_id = version_id(pairs)
+    if parent and parent["id"] == content_id:
+        return parent
+
+    number = parent["number"] + 1 if parent else 1
+    version = {
+        "number": number,
+        "id": content_id,
+        "parent": parent["number"] if parent else None,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "val_fraction": val_fraction,
+        "note": note,
+        "pairs": pairs,
+    }
+    os.makedirs(VERSIONS_DIR, exist_ok=True)
+    tmp_path = _version_path(number) + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(version, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, _version_path(number))
+    return version
+
+
+def select(version, reviewed=True, split=None):
+    """Names of pairs with an image, in name order, filtered by review status and split."""
+    return [name for name, pair in sorted(version["pairs"].items())
+            if pair["image"] and pair["reviewed"] == reviewed and (split is None or pair["split"] == split)]
+
+
+def pair_entries(version, names):
+    """{name: DatasetEntry} with on-disk paths for the given names."""
+    pairs = version["pairs"]
+    return {name: DatasetEntry(name,
+                               os.path.join(IMAGES_DIR, pairs[name]["image"]) if pairs[name]["image"] else None,
+                               os.path.join(LABELS_DIR, name + ".txt"),
+                               pairs[name]["boxes"],
+                               pairs[name]["mtime"])
+            for name in names}
+
+
+def diff(old, new):
+    """(added, changed, removed) names between two versions; old may be None."""
+    old_pairs = old["pairs"] if old else {}
+    new_pairs = new["pairs"]
+    added = sorted(n for n in new_pairs if n not in old_pairs)
+    removed = sorted(n for n in old_pairs if n not in new_pairs)
+    changed = sorted(n for n in new_pairs if n in old_pairs and any(
+        old_pairs[n][k] != new_pairs[n][k] for k in ("image", "image_sha", "label_sha", "reviewed", "split")))
+    return added, changed, removed
+
+
+def load_export_manifest(path, **defaults):
+    """What an export wrote last time ({name: {image, sig}} pairs); a fresh one if missing or stale."""
+    try:
+        with open(path, "r") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == EXPORT_MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"version": EXPORT_MANIFEST_VERSION, "dataset_version": None, "pairs": {}, **defaults}
+
+
+def save_export_manifest(path, manifest):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _remove_file(path):
+    if os.path.isfile(path) or os.path.islink(path):
+        os.remove(path)
+
+
+def remove_exported(images_dir, labels_dir, name, image):
+    """Removes one exported pair; only files, never directories or anything else in the folder."""
+    _remove_file(os.path.join(images_dir, image))
+    _remove_file(os.path.join(labels_dir, name + ".txt"))
+
+
+def sync_exported(entries, signatures, manifest, images_dir, labels_dir, place=shutil.copy2):
+    """
+    Brings an image/label export in line with `entries`, touching only files the manifest says it
+    wrote: pairs that left are removed, and pairs whose signature changed (or whose files went
+    missing) are written again with place(source, dest). Returns (written, removed).
+    """
+    os.makedirs(images_dir, exist_ok=True)
+    os.makedirs(labels_dir, exist_ok=True)
+    pairs = manifest["pairs"]
+
+    removed = [name for name in pairs if name not in entries]
+    for name in removed:
+        remove_exported(images_dir, labels_dir, name, pairs.pop(name)["image"])
+
+    written = 0
+    for name, entry in entries.items():
+        image = os.path.basename(entry.image_path)
+        dest_image = os.path.join(images_dir, image)
+        dest_label = os.path.join(labels_dir, name + ".txt")
+        previous = pairs.get(name)
+        if previous and previous["sig"] == signatures[name] and previous["image"] == image \
+                and os.path.exists(dest_image) and os.path.exists(dest_label):
+            continue
+        if previous:
+            remove_exported(images_dir, labels_dir, name, previous["image"])
+        for source, dest in ((entry.image_path, dest_image), (entry.label_path, dest_label)):
+            _remove_file(dest)  # never write through an old hardlink into the source tree
+            place(source, dest)
+        pairs[name] = {"image": image, "sig": signatures[name]}
+        written += 1
+    return written, len(removed)
@@ -0,0 +1,242 @@
+# dbHelper.py — shared SQLite connection factory and schema migrations
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "../../"))
+DB_PATH = os.path.join(PROJECT_ROOT, "database", "autographs.db")
+
+sqlite3.register_adapter(datetime, lambda val: val.isoformat())
+sqlite3.register_converter("timestamp", lambda val: datetime.fromisoformat(val.decode("utf-8")))
+
+# WAL lets the scraper write while export scripts read; NORMAL sync is safe under WAL.
+PRAGMAS = [
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -65536",      # 64 MB page cache
+    "PRAGMA mmap_size = 268435456",    # 256 MB memory-mapped I/O
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 30000",
+]
+
+# Each entry moves the schema from version N to N + 1 (tracked in PRAGMA user_version).
+# Append new migrations to the end; never edit one that has shipped.
+MIGRATIONS = [
+    # 1: base tables (IF NOT EXISTS so databases created before versioning upgrade cleanly)
+    [
+        '''CREATE TABLE IF NOT EXISTS signers (
+            id INTEGER PRIMARY KEY,
+            full_name TEXT NOT NULL,
+            category TEXT NOT NULL,
+            birth_year INTEGER,
+            active_years TEXT,
+            nationality TEXT,
+            notable_works TEXT,
+            deceased BOOLEAN,
+            UNIQUE(full_name, category))''',
+        '''CREATE TABLE IF NOT EXISTS autographs (
+            id INTEGER PRIMARY KEY,
+            title TEXT,
+            price TEXT,
+            img_url TEXT,
+            listing_url TEXT UNIQUE,
+            category TEXT,
+            signer_id INTEGER,
+            confidence REAL,
+            last_seen TIMESTAMP,
+            run_id INTEGER,
+            FOREIGN KEY (signer_id) REFERENCES signers(id),
+            FOREIGN KEY (run_id) REFERENCES scrape_runs(id))''',
+        '''CREATE TABLE IF NOT EXISTS scrape_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            notes TEXT)''',
+    ],
+    # 2: indexes for the export scripts' filters and GROUP BY img_url
+    [
+        "CREATE INDEX IF NOT EXISTS idx_autographs_signer_id ON autographs(signer_id)",
+        "CREATE INDEX IF NOT EXISTS idx_autographs_img_url ON autographs(img_url, signer_id)",
+        "CREATE INDEX IF NOT EXISTS idx_autographs_run_id ON autographs(run_id)",
+    ],
+    # 3: content-addressed image store (see imageStore.py)
+    [
+        '''CREATE TABLE IF NOT EXISTS image_blobs (
+            url_hash TEXT PRIMARY KEY,
+            img_url TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            ext TEXT,
+            bytes INTEGER,
+            fetched_at TIMESTAMP)''',
+        "CREATE INDEX IF NOT EXISTS idx_image_blobs_content_hash ON image_blobs(content_hash)",
+    ],
+    # 4: export ledger replacing the exported_training.txt / exported.txt logs (see exportLedger.py)
+    [
+        '''CREATE TABLE IF NOT EXISTS exports (
+            id INTEGER PRIMARY KEY,
+            url TEXT NOT NULL,
+            destination TEXT NOT NULL,
+            status TEXT NOT NULL,
+            path TEXT,
+            bytes INTEGER,
+            created_at TIMESTAMP,
+            updated_at TIMESTAMP,
+            error TEXT,
+            UNIQUE(url, destination))''',
+        "CREATE INDEX IF NOT EXISTS idx_exports_destination_status ON exports(destination, status)",
+    ],
+    # 5: WikiData signer reference list and resumable sync cursors
+    [
+        '''CREATE TABLE IF NOT EXISTS signers_ref (
+            qid TEXT PRIMARY KEY,
+            label TEXT NOT NULL,
+            name TEXT NOT NULL,
+            updated_at TIMESTAMP)''',
+        "CREATE INDEX IF NOT EXISTS idx_signers_ref_name ON signers_ref(name)",
+        '''CREATE TABLE IF NOT EXISTS sync_cursors (
+            name TEXT PRIMARY KEY,
+            cursor INTEGER NOT NULL,
+            updated_at TIMESTAMP)''',
+    ],
+    # 6: WikiData name-span cache (label NULL = negative result); see wikidataResolver.py
+    [
+        '''CREATE TABLE IF NOT EXISTS wikidata_cache (
+            key TEXT PRIMARY KEY,
+            label TEXT,
+            qid TEXT,
+            expires_at REAL NOT NULL,
+            last_used REAL NOT NULL)''',
+        "CREATE INDEX IF NOT EXISTS idx_wikidata_cache_last_used ON wikidata_cache(last_used)",
+    ],
+    # 7: per-(run, category) scrape checkpoints for --resume
+    [
+        '''CREATE TABLE IF NOT EXISTS scrape_checkpoints (
+            run_id INTEGER NOT NULL,
+            category TEXT NOT NULL,
+            last_page INTEGER NOT NULL DEFAULT 0,
+            results INTEGER NOT NULL DEFAULT 0,
+            done BOOLEAN NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP,
+            PRIMARY KEY (run_id, category),
+            FOREIGN KEY (run_id) REFERENCES scrape_runs(id))''',
+    ],
+    # 8: numeric price columns parsed from the price text (see priceHelper.py, backfill_prices.py)
+    [
+        "ALTER TABLE autographs ADD COLUMN price_min REAL",
+        "ALTER TABLE autographs ADD COLUMN price_max REAL",
+        "ALTER TABLE autographs ADD COLUMN price_currency TEXT",
+        "CREATE INDEX IF NOT EXISTS idx_autographs_price ON autographs(price_min)",
+    ],
+    # 9: append-only listing sightings, rolled up into listing_price_summary (see listing_history.py)
+    [
+        '''CREATE TABLE IF NOT EXISTS listing_observations (
+            id INTEGER PRIMARY KEY,
+            autograph_id INTEGER NOT NULL,
+            run_id INTEGER NOT NULL,
+            observed_at TIMESTAMP NOT NULL,
+            price TEXT,
+            price_min REAL,
+            price_max REAL,
+            price_currency TEXT,
+            UNIQUE(autograph_id, run_id),
+            FOREIGN KEY (autograph_id) REFERENCES autographs(id),
+            FOREIGN KEY (run_id) REFERENCES scrape_runs(id))''',
+        "CREATE INDEX IF NOT EXISTS idx_listing_observations_run_id ON listing_observations(run_id)",
+        '''CREATE TABLE IF NOT EXISTS listing_price_summary (
+            autograph_id INTEGER PRIMARY KEY,
+            observations INTEGER NOT NULL,
+            priced_observations INTEGER NOT NULL,
+            first_seen TIMESTAMP,
+            last_seen TIMESTAMP,
+            price_low REAL,
+            price_high REAL,
+            price_sum REAL,
+            updated_at TIMESTAMP,
+            FOREIGN KEY (autograph_id) REFERENCES autographs(id))''',
+        # Compacted aggregates plus raw sightings not yet rolled up: full history in one place.
+        '''CREATE VIEW IF NOT EXISTS listing_price_history AS
+            SELECT autograph_id,
+                   SUM(observations) AS observations,
+                   MIN(first_seen) AS first_seen,
+                   MAX(last_seen) AS last_seen,
+                   MIN(price_low) AS price_low,
+                   MAX(price_high) AS price_high,
+                   SUM(price_sum) / NULLIF(SUM(priced_observations), 0) AS price_avg
+            FROM (
+                SELECT autograph_id, observations, priced_observations, first_seen, last_seen,
+                       price_low, price_high, price_sum
+                FROM listing_price_summary
+                UNION ALL
+                SELECT autograph_id, 1, price_min IS NOT NULL, observed_at, observed_at,
+                       price_min, price_max, (price_min + price_max) / 2.0
+                FROM listing_observations
+            )
+            GROUP BY autograph_id''',
+    ],
+    # 10: perceptual hashes per stored blob for near-duplicate detection (see imageHashes.py)
+    [
+        '''CREATE TABLE IF NOT EXISTS image_hashes (
+            content_hash TEXT PRIMARY KEY,
+            phash TEXT,
+            dhash TEXT,
+            width INTEGER,
+            height INTEGER,
+            computed_at TIMESTAMP)''',
+        "CREATE INDEX IF NOT EXISTS idx_image_blobs_img_url ON image_blobs(img_url)",
+    ],
+    # 11: exports that failed with a permanent HTTP error are final ("gone"), not retried
+    [
+        "UPDATE exports SET status = 'gone' WHERE status = 'failed' AND error IN ('HTTP 404', 'HTTP 410')",
+    ],
+]
+
+_migrated_paths = set()
+
+
+def apply_migrations(conn):
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    if current >= len(MIGRATIONS):
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Re-read under the write lock in case another process migrated first.
+        current = conn.execute("PRAGMA user_version").fetchone()[0]
+        for version in range(current, len(MIGRATIONS)):
+            step = MIGRATIONS[version]
+            if callable(step):
+                step(conn)
+            else:
+                for statement in step:
+                    conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+            print(f"🧱 Applied database migration {version + 1}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def load_cursor(conn, name, default=0):
+    row = conn.execute("SELECT cursor FROM sync_cursors WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else default
+
+
+def save_cursor(conn, name, cursor):
+    conn.execute(
+        '''INSERT INTO sync_cursors (name, cursor, updated_at) VALUES (?, ?, ?)
+           ON CONFLICT(name) DO UPDATE SET cursor = excluded.cursor, updated_at = excluded.updated_at''',
+        (name, cursor, datetime.now(timezone.utc)),
+    )
+
+
+def get_connection(db_path=DB_PATH, migrate=True):
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+
+    if migrate and db_path not in _migrated_paths:
+        apply_migrations(conn)
+        _migrated_paths.add(db_path)
+    return conn
@@ -0,0 +1,107 @@
+# downloadHelper.py — concurrent image downloader shared by the export scripts
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+CHUNK_SIZE = 256 * 1024
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class Downloader:
+    """
+    Thread-pooled downloader with one pooled requests.Session, a cap on
+    concurrent requests per host, and jittered exponential backoff on retries.
+    """
+
+    def __init__(self, workers=16, per_host=4, retries=3, backoff=1.0, timeout=15, headers=None):
+        self.workers = workers
+        self.per_host = per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or HEADERS)
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+    def _slot(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.Semaphore(self.per_host)
+            return self._host_slots[host]
+
+    def _sleep_before_retry(self, attempt):
+        delay = self.backoff * (2 ** (attempt - 1))
+        time.sleep(random.uniform(0, delay))
+
+    def fetch(self, url, dest_path):
+        result = {"url": url, "path": dest_path, "ok": False, "status": None, "bytes": 0, "error": None}
+        tmp_path = dest_path + ".part"
+
+        for attempt in range(1, self.retries + 1):
+            try:
+                with self._slot(url):
+                    with self.session.get(url, stream=True, timeout=self.timeout) as response:
+                        result["status"] = response.status_code
+                        if response.status_code == 200:
+                            written = 0
+                            with open(tmp_path, "wb") as out:
+                                for chunk in response.iter_content(CHUNK_SIZE):
+                                    out.write(chunk)
+                                    written += len(chunk)
+                            os.replace(tmp_path, dest_path)
+                            result.update(ok=True, bytes=written, error=None)
+                            return result
+                        result["error"] = f"HTTP {response.status_code}"
+                        if response.status_code not in RETRY_STATUSES:
+                            return result
+            except Exception as e:
+                result["error"] = str(e)
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+            if attempt < self.retries:
+                self._sleep_before_retry(attempt)
+        return result
+
+    def download_many(self, jobs, on_result=None):
+        """
+        Downloads (url, dest_path) pairs concurrently.
+        on_result(result) runs on the calling thread as each download finishes.
+        """
+        results = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self.fetch, url, dest_path) for url, dest_path in jobs]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                if on_result:
+                    on_result(result)
+        return results
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def download_many(jobs, on_result=None, **kwargs):
+    with Downloader(**kwargs) as downloader:
+        return downloader.download_many(jobs, on_result=on_result)
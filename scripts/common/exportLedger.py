@@ -0,0 +1,64 @@
+# exportLedger.py — per-destination export state kept in the `exports` table
+import os
+from datetime import datetime, timezone
+
+# Export rows in these states are retried on the next run; everything else is final.
+RETRYABLE_EXPORT_STATUSES = ("failed",)
+
+# HTTP responses that mean the image is never coming back; recorded as "gone", not retried.
+GONE_HTTP_STATUSES = {404, 410}
+
+# SQL fragment for "this img_url has not been exported to destination ?" (alias the autographs table as `a`).
+NOT_EXPORTED = f"""NOT EXISTS (
+    SELECT 1 FROM exports e
+    WHERE e.url = a.img_url AND e.destination = ?
+      AND e.status NOT IN ({','.join(repr(s) for s in RETRYABLE_EXPORT_STATUSES)}))"""
+
+
+def import_legacy_log(conn, log_path, destination):
+    """One-time import of an old flat-file export log; the file is renamed afterwards."""
+    if not os.path.exists(log_path):
+        return 0
+
+    now = datetime.now(timezone.utc)
+    with open(log_path, "r") as f:
+        urls = {line.strip() for line in f if line.strip()}
+    conn.executemany(
+        '''INSERT OR IGNORE INTO exports (url, destination, status, created_at, updated_at)
+           VALUES (?, ?, 'exported', ?, ?)''',
+        [(url, destination, now, now) for url in urls],
+    )
+    conn.commit()
+    os.replace(log_path, log_path + ".imported")
+    print(f"📥 Imported {len(urls)} URLs from legacy log {log_path}")
+    return len(urls)
+
+
+def record_export(conn, destination, url, status, path=None, size=None, error=None):
+    now = datetime.now(timezone.utc)
+    conn.execute(
+        '''INSERT INTO exports (url, destination, status, path, bytes, created_at, updated_at, error)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+           ON CONFLICT(url, destination) DO UPDATE SET
+               status = excluded.status,
+               path = excluded.path,
+               bytes = excluded.bytes,
+               updated_at = excluded.updated_at,
+               error = excluded.error''',
+        (url, destination, status, path, size, now, now, error),
+    )
+    conn.commit()
+
+
+def result_status(result):
+    if result["ok"]:
+        return "exported"
+    return "gone" if result.get("status") in GONE_HTTP_STATUSES else "failed"
+
+
+def record_result(conn, destination, result):
+    status = result_status(result)
+    if status == "exported":
+        record_export(conn, destination, result["url"], status, result["path"], result.get("bytes"))
+    else:
+        record_export(conn, destination, result["url"], status, error=result["error"])
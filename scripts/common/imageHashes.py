@@ -0,0 +1,235 @@
+# imageHashes.py — perceptual hashes of stored images and near-duplicate lookup
+#
+# Every blob in the image store gets a 64-bit pHash (DCT) and dHash (gradient), keyed by its
+# content hash in image_hashes. Two images are near-duplicates when both hashes are within
+# MAX_DISTANCE bits; lookups go through a BK-tree on pHash so they don't scan every image.
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+from PIL import Image
+
+from exportLedger import record_export, record_result
+from imageStore import blob_path
+
+MAX_DISTANCE = 8      # bits out of 64
+HASH_WORKERS = os.cpu_count() or 2
+BATCH_SIZE = 500      # hashes written per commit
+
+
+def _dct_matrix(n):
+    k = np.arange(n)
+    matrix = np.cos(np.pi / n * (k[None, :] + 0.5) * k[:, None])
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+DCT_32 = _dct_matrix(32)
+
+
+def bits_to_int(bits):
+    value = 0
+    for bit in bits.flatten():
+        value = (value << 1) | int(bit)
+    return value
+
+
+def phash(image):
+    pixels = np.asarray(image.convert("L").resize((32, 32), Image.Resampling.LANCZOS), dtype=np.float64)
+    low = (DCT_32 @ pixels @ DCT_32.T)[:8, :8]
+    return bits_to_int(low > np.median(low.flatten()[1:]))  # median without the DC term
+
+
+def dhash(image):
+    pixels = np.asarray(image.convert("L").resize((9, 8), Image.Resampling.LANCZOS), dtype=np.int16)
+    return bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+def hash_file(path):
+    """(phash, dhash, width, height) as ints, or None if the file isn't a readable image."""
+    try:
+        with Image.open(path) as image:
+            image.load()
+            return phash(image), dhash(image), image.width, image.height
+    except Exception:
+        return None
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """Burkhard-Keller tree over Hamming distance: radius searches only visit matching subtrees."""
+
+    def __init__(self):
+        self.root = None  # [hash, items, {distance: child}]
+        self.size = 0
+
+    def add(self, value, item):
+        self.size += 1
+        if self.root is None:
+            self.root = [value, [item], {}]
+            return
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value, max_distance):
+        """[(distance, item)] for everything within max_distance of value."""
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= max_distance:
+                found.extend((distance, item) for item in node[1])
+            for edge, child in node[2].items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        return found
+
+
+class NearDuplicateIndex:
+    def __init__(self, max_distance=MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.tree = BKTree()
+
+    def add(self, key, phash_value, dhash_value):
+        self.tree.add(phash_value, (key, dhash_value))
+
+    def find(self, phash_value, dhash_value):
+        """Keys of indexed images whose pHash and dHash are both within max_distance."""
+        return [key for _, (key, other_dhash) in sorted(self.tree.search(phash_value, self.max_distance))
+                if hamming(dhash_value, other_dhash) <= self.max_distance]
+
+
+def hash_missing(conn, workers=HASH_WORKERS):
+    """Hashes every stored blob that has no image_hashes row yet, in a process pool."""
+    rows = conn.execute('''SELECT DISTINCT b.content_hash, b.ext
+                           FROM image_blobs b
+                           LEFT JOIN image_hashes h ON h.content_hash = b.content_hash
+                           WHERE h.content_hash IS NULL''').fetchall()
+    rows = [(content_hash, blob_path(content_hash, ext)) for content_hash, ext in rows]
+    rows = [(content_hash, path) for content_hash, path in rows if os.path.exists(path)]
+    if not rows:
+        return 0
+
+    print(f"🧮 Hashing {len(rows)} images with {workers} workers...")
+    pending = []
+
+    def flush():
+        # Unreadable images get NULL hashes so they aren't retried on every run.
+        conn.executemany(
+            '''INSERT OR REPLACE INTO image_hashes (content_hash, phash, dhash, width, height, computed_at)
+               VALUES (?, ?, ?, ?, ?, ?)''', pending)
+        conn.commit()
+        pending.clear()
+
+    now = datetime.now(timezone.utc)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        hashed = executor.map(hash_file, [path for _, path in rows], chunksize=32)
+        for (content_hash, _), result in zip(rows, hashed):
+            p, d, width, height = result or (None, None, None, None)
+            pending.append((content_hash,
+                            f"{p:016x}" if p is not None else None,
+                            f"{d:016x}" if d is not None else None,
+                            width, height, now))
+            if len(pending) >= BATCH_SIZE:
+                flush()
+    if pending:
+        flush()
+    print(f"✅ Hashed {len(rows)} images")
+    return len(rows)
+
+
+def load_hashes(conn, urls):
+    """{img_url: (content_hash, phash, dhash)} for URLs whose blob has been hashed."""
+    urls = list(dict.fromkeys(urls))
+    found = {}
+    for start in range(0, len(urls), 500):
+        chunk = urls[start:start + 500]
+        placeholders = ','.join('?' for _ in chunk)
+        for url, content_hash, p, d in conn.execute(
+                f'''SELECT b.img_url, b.content_hash, h.phash, h.dhash
+                    FROM image_blobs b JOIN image_hashes h ON h.content_hash = b.content_hash
+                    WHERE b.img_url IN ({placeholders}) AND h.phash IS NOT NULL''', chunk):
+            found[url] = (content_hash, int(p, 16), int(d, 16))
+    return found
+
+
+def filter_near_duplicates(conn, urls, destination=None, max_distance=MAX_DISTANCE):
+    """
+    Splits urls into (keep, duplicates) where duplicates maps a URL to the earlier image it
+    repeats: one already exported to `destination`, or one earlier in `urls`.
+    URLs without a hash yet are kept.
+    """
+    index = NearDuplicateIndex(max_distance)
+    if destination:
+        for url, p, d in conn.execute(
+                '''SELECT e.url, h.phash, h.dhash
+                   FROM exports e
+                   JOIN image_blobs b ON b.img_url = e.url
+                   JOIN image_hashes h ON h.content_hash = b.content_hash
+                   WHERE e.destination = ? AND e.status = 'exported' AND h.phash IS NOT NULL''',
+                (destination,)):
+            index.add(url, int(p, 16), int(d, 16))
+
+    hashes = load_hashes(conn, urls)
+    keep, duplicates = [], {}
+    for url in urls:
+        if url not in hashes:
+            keep.append(url)
+            continue
+        _, p, d = hashes[url]
+        matches = index.find(p, d)
+        if matches:
+            duplicates[url] = matches[0]
+        else:
+            index.add(url, p, d)
+            keep.append(url)
+    return keep, duplicates
+
+
+def export_deduplicated(store, conn, jobs, destination):
+    """
+    Exports (url, dest_path) jobs through `store`, skipping near-duplicates of images already
+    exported to `destination` (or earlier in `jobs`). Everything is downloaded and hashed first,
+    so the same photo under another URL isn't exported twice. URLs that fail to download are
+    recorded (failed and retried next run, or gone on a 404/410) and not fetched again for the export.
+    """
+    def record(result):
+        record_result(conn, destination, result)
+        if result["ok"]:
+            action = "Linked from store" if result["cached"] else "Downloaded"
+            print(f"✅ {action}: {os.path.basename(result['path'])}")
+        else:
+            print(f"❌ Failed to fetch: {result['url']} ({result['error']})")
+
+    failed = set()
+
+    def fetched(result):
+        if not result["ok"]:
+            failed.add(result["url"])
+            record(result)
+
+    urls = [url for url, _ in jobs]
+    store.fetch(urls, on_result=fetched)
+    hash_missing(conn)
+    keep, duplicates = filter_near_duplicates(conn, [url for url in urls if url not in failed], destination)
+    for url, original in duplicates.items():
+        print(f"🪞 Skipping near-duplicate of {original}: {url}")
+        record_export(conn, destination, url, "near_duplicate")
+
+    keep = set(keep)
+    store.export([job for job in jobs if job[0] in keep], on_result=record)
+    return len(keep), len(duplicates), len(failed)
@@ -0,0 +1,182 @@
+# imageStore.py — content-addressed local image store shared by every export
+import hashlib
+import os
+import shutil
+from datetime import datetime, timezone
+
+from dbHelper import PROJECT_ROOT, get_connection
+from downloadHelper import Downloader
+
+STORE_DIR = os.path.join(PROJECT_ROOT, "data", "store")
+BLOB_DIR = os.path.join(STORE_DIR, "blobs")
+TMP_DIR = os.path.join(STORE_DIR, "tmp")
+IMAGE_EXTS = [".jpg", ".jpeg", ".png", ".webp"]
+
+
+def url_hash(url):
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def url_ext(url):
+    ext = os.path.splitext(url)[1].split('?')[0].lower()
+    return ext if ext in IMAGE_EXTS else ".jpg"
+
+
+def sniff_ext(path, fallback):
+    # Name blobs by their real format so identical bytes always map to one path.
+    with open(path, "rb") as f:
+        head = f.read(12)
+    if head.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if head.startswith(b"\x89PNG"):
+        return ".png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    return fallback
+
+
+def blob_path(content_hash, ext):
+    return os.path.join(BLOB_DIR, content_hash[:2], content_hash + ext)
+
+
+def link_into(source, dest):
+    """Hardlink a blob into an export directory, falling back to a symlink, then a copy."""
+    if os.path.exists(dest):
+        return dest
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    try:
+        os.link(source, dest)
+    except OSError:
+        try:
+            os.symlink(os.path.abspath(source), dest)
+        except OSError:
+            shutil.copy2(source, dest)
+    return dest
+
+
+class ImageStore:
+    """
+    Each image URL is fetched once and stored under the SHA-256 of its bytes,
+    so identical images served from different URLs share one blob.
+    The url -> blob mapping lives in the image_blobs table.
+    """
+
+    def __init__(self, conn=None, **downloader_kwargs):
+        self.conn = conn or get_connection()
+        self.downloader_kwargs = downloader_kwargs
+
+    def lookup(self, urls):
+        found = {}
+        hashes = {url_hash(url): url for url in urls}
+        keys = list(hashes)
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' for _ in chunk)
+            rows = self.conn.execute(
+                f"SELECT url_hash, content_hash, ext FROM image_blobs WHERE url_hash IN ({placeholders})",
+                chunk,
+            ).fetchall()
+            for key, content_hash, ext in rows:
+                path = blob_path(content_hash, ext)
+                if os.path.exists(path):
+                    found[hashes[key]] = path
+        return found
+
+    def _adopt(self, url, tmp_path):
+        content_hash = file_hash(tmp_path)
+        ext = sniff_ext(tmp_path, url_ext(url))
+        path = blob_path(content_hash, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+
+        self.conn.execute(
+            '''INSERT INTO image_blobs (url_hash, img_url, content_hash, ext, bytes, fetched_at)
+               VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT(url_hash) DO UPDATE SET
+                   content_hash = excluded.content_hash,
+                   ext = excluded.ext,
+                   bytes = excluded.bytes,
+                   fetched_at = excluded.fetched_at''',
+            (url_hash(url), url, content_hash, ext, os.path.getsize(path), datetime.now(timezone.utc)),
+        )
+        self.conn.commit()
+        return path
+
+    def fetch(self, urls, on_result=None):
+        """
+        Makes sure every URL has a blob; only URLs not already stored are downloaded.
+        on_result(result) gets a dict with url, path (the blob), ok, cached, status (the HTTP
+        status of a download, None when cached), bytes and error.
+        Returns {url: blob path} for every URL that is now stored.
+        """
+        urls = list(dict.fromkeys(urls))
+        paths = self.lookup(urls)
+        for url, path in paths.items():
+            if on_result:
+                on_result({"url": url, "path": path, "ok": True, "cached": True, "status": None,
+                           "bytes": os.path.getsize(path), "error": None})
+
+        missing = [url for url in urls if url not in paths]
+        if not missing:
+            return paths
+
+        os.makedirs(TMP_DIR, exist_ok=True)
+
+        def stored(result):
+            out = {"url": result["url"], "path": None, "ok": False, "cached": False,
+                   "status": result["status"], "bytes": result["bytes"], "error": result["error"]}
+            if result["ok"]:
+                try:
+                    out["path"] = paths[result["url"]] = self._adopt(result["url"], result["path"])
+                    out["ok"] = True
+                except Exception as e:
+                    out["error"] = str(e)
+            if on_result:
+                on_result(out)
+
+        jobs = [(url, os.path.join(TMP_DIR, url_hash(url))) for url in missing]
+        with Downloader(**self.downloader_kwargs) as downloader:
+            downloader.download_many(jobs, on_result=stored)
+        return paths
+
+    def export(self, jobs, on_result=None):
+        """
+        Materializes (url, dest_path) pairs as links into the store.
+        on_result receives the fetch result with `path` set to the export path.
+        """
+        dests = {}
+        for url, dest in jobs:
+            dests.setdefault(url, []).append(dest)
+
+        def linked(result):
+            if result["ok"]:
+                try:
+                    for dest in dests[result["url"]]:
+                        link_into(result["path"], dest)
+                    result["path"] = dests[result["url"]][0]
+                except Exception as e:
+                    result.update(ok=False, error=str(e))
+            if on_result:
+                on_result(result)
+
+        return self.fetch(list(dests), on_result=linked)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,38 @@
+# listingUrl.py — canonical eBay listing URLs keyed by item ID
+#
+# Search results link to the same item with different slugs and tracking query strings
+# ("/itm/Some-Title/123456789012?hash=...&_trkparms=..."). Every form of one item maps to
+# https://www.ebay.com/itm/<item id>, which is what goes into autographs.listing_url.
+import re
+from urllib.parse import urlsplit, urlunsplit
+
+CANONICAL_ITEM_URL = "https://www.ebay.com/itm/{item_id}"
+# /itm/<id>, /itm/<slug>/<id>, or the legacy ViewItem ...&item=<id> query parameter
+ITEM_ID_RE = re.compile(r"/itm/(?:[^/?#]+/)?(\d{9,15})(?=[/?#]|$)|[?&]item=(\d{9,15})(?=&|#|$)")
+
+
+def item_id(url):
+    if not url:
+        return None
+    match = ITEM_ID_RE.search(url)
+    if not match:
+        return None
+    return match.group(1) or match.group(2)
+
+
+def canonical_listing_url(url):
+    """Canonical item URL, or the URL without query/fragment when it has no item ID."""
+    if not url:
+        return url
+    found = item_id(url)
+    if found:
+        return CANONICAL_ITEM_URL.format(item_id=found)
+    try:
+        parts = urlsplit(url.strip())
+        return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, "", ""))
+    except ValueError:
+        return url.strip().split("?")[0]
+
+
+def canonicalize_many(urls):
+    return [canonical_listing_url(url) for url in urls]
@@ -0,0 +1,49 @@
+# priceHelper.py — eBay price text ("$12.99", "$5.00 to $20.00", "N/A") -> numeric columns
+import re
+
+# Longest prefixes first so "US $" wins over "$".
+CURRENCY_PREFIXES = [
+    ("US $", "USD"), ("C $", "CAD"), ("AU $", "AUD"), ("NZ $", "NZD"), ("HK $", "HKD"),
+    ("USD", "USD"), ("CAD", "CAD"), ("AUD", "AUD"), ("GBP", "GBP"), ("EUR", "EUR"),
+    ("£", "GBP"), ("€", "EUR"), ("¥", "JPY"), ("$", "USD"),
+]
+AMOUNT_RE = re.compile(r"\d[\d,.]*")
+
+
+def parse_amount(text):
+    """
+    "1,234.50", "1.234,50", "12,50", "1,234" -> float. When both separators appear the last one is
+    the decimal point; a lone separator is a thousands group when it has exactly three digits after it.
+    """
+    text = text.rstrip(".,")
+    point = max(text.rfind(","), text.rfind("."))
+    if point != -1:
+        sep = text[point]
+        other = "." if sep == "," else ","
+        if other in text or (text.count(sep) == 1 and len(text) - point - 1 != 3):
+            text = text[:point].replace(other, "").replace(sep, "") + "." + text[point + 1:]
+        else:
+            text = text.replace(sep, "")
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def parse_currency(text):
+    text = text.strip().upper()
+    for prefix, code in CURRENCY_PREFIXES:
+        if prefix in text:
+            return code
+    return None
+
+
+def parse_price(text):
+    """Returns (price_min, price_max, currency); all None when there is no amount."""
+    if not text:
+        return None, None, None
+
+    amounts = [a for a in (parse_amount(m) for m in AMOUNT_RE.findall(text)) if a is not None]
+    if not amounts:
+        return None, None, None
+    return min(amounts), max(amounts), parse_currency(text)
@@ -0,0 +1,142 @@
+import functools
+import os
+
+import pytest
+
+import datasetIndex
+import datasetManifest
+from datasetManifest import (assign_split, load_export_manifest, pair_entries, pair_key, save_export_manifest,
+                             select, snapshot, split_group, sync_exported)
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    images = tmp_path / "raw"
+    labels = tmp_path / "labels"
+    images.mkdir()
+    labels.mkdir()
+    monkeypatch.setattr(datasetManifest, "IMAGES_DIR", str(images))
+    monkeypatch.setattr(datasetManifest, "LABELS_DIR", str(labels))
+    monkeypatch.setattr(datasetManifest, "VERSIONS_DIR", str(tmp_path / "versions"))
+    monkeypatch.setattr(datasetManifest, "LEGACY_REVIEWED_PATH", str(tmp_path / "legacy_reviewed.txt"))
+    monkeypatch.setattr(datasetManifest, "load_index", functools.partial(
+        datasetIndex.load_index, str(images), str(labels), str(tmp_path / "index.pkl")))
+
+    def add(name, boxes=1):
+        (images / f"{name}.jpg").write_bytes(name.encode())
+        (labels / f"{name}.txt").write_text("0 0.5 0.5 0.1 0.1\n" * boxes)
+
+    return add
+
+
+def test_review_is_by_name_across_overlapping_export_runs(dataset):
+    # Both export runs number their files from 000, so the names interleave.
+    first_run = ["000_signer1_aaaa", "001_signer2_bbbb", "002_signer1_cccc"]
+    second_run = ["000_signer3_dddd", "001_signer4_eeee"]
+    for name in first_run:
+        dataset(name)
+    v1 = snapshot(first_run)
+    for name in second_run:
+        dataset(name)
+    v2 = snapshot()
+
+    assert v2["number"] == v1["number"] + 1
+    assert select(v2, reviewed=True) == sorted(first_run)
+    assert select(v2, reviewed=False) == sorted(second_run)
+
+    # Reviewing a whole version marks exactly the pairs it listed.
+    v3 = snapshot(v2["pairs"])
+    assert select(v3, reviewed=False) == []
+
+
+def test_legacy_list_seeds_only_the_first_version(dataset):
+    dataset("000_signer1_aaaa")
+    dataset("2424_signer3_ffff")
+    with open(datasetManifest.LEGACY_REVIEWED_PATH, "w") as f:
+        f.write("# reviewed before versions\n2424_signer3_ffff.jpg\n")
+    v1 = snapshot()
+    assert select(v1, reviewed=True) == ["2424_signer3_ffff"]
+
+    dataset("001_signer5_gggg")
+    with open(datasetManifest.LEGACY_REVIEWED_PATH, "a") as f:
+        f.write("001_signer5_gggg\n")
+    v2 = snapshot()
+    assert select(v2, reviewed=True) == ["2424_signer3_ffff"]
+
+
+def test_unchanged_dataset_reuses_the_latest_version(dataset):
+    dataset("000_signer1_aaaa")
+    v1 = snapshot(["000_signer1_aaaa"])
+    assert snapshot()["number"] == v1["number"]
+    assert snapshot(["no_such_pair"])["number"] == v1["number"]
+
+
+def test_split_groups_by_signer_and_is_stable():
+    assert split_group("000_signer12_aaaa") == split_group("417_signer12_bbbb") == "signer12"
+    assert split_group("no_signer_here") == "no_signer_here"
+    assert assign_split("000_signer12_aaaa") == assign_split("417_signer12_bbbb")
+
+    splits = [assign_split(f"000_signer{i}_aaaa", 0.2) for i in range(2000)]
+    assert 0.15 < splits.count("val") / len(splits) < 0.25
+    assert all(assign_split(f"000_signer{i}_aaaa", 0.0) == "train" for i in range(200))
+    assert all(assign_split(f"000_signer{i}_aaaa", 1.0) == "val" for i in range(200))
+
+
+def test_snapshot_rehashes_edited_labels(dataset):
+    dataset("000_signer1_aaaa")
+    v1 = snapshot(["000_signer1_aaaa"])
+    label = os.path.join(datasetManifest.LABELS_DIR, "000_signer1_aaaa.txt")
+    with open(label, "a") as f:
+        f.write("0 0.1 0.1 0.05 0.05\n")
+    os.utime(label, ns=(1, 10 ** 18))  # the edit must move the mtime for a rescan to notice
+    v2 = snapshot()
+    assert v2["number"] == v1["number"] + 1
+    assert v2["pairs"]["000_signer1_aaaa"]["label_sha"] != v1["pairs"]["000_signer1_aaaa"]["label_sha"]
+    assert v2["pairs"]["000_signer1_aaaa"]["reviewed"]
+
+
+def export(version, dest, manifest):
+    names = select(version, reviewed=True)
+    entries = pair_entries(version, names)
+    signatures = {name: pair_key(version["pairs"][name]) for name in names}
+    return sync_exported(entries, signatures, manifest, str(dest / "images"), str(dest / "labels"))
+
+
+def test_sync_exported_only_touches_what_it_wrote(dataset, tmp_path):
+    dest = tmp_path / "export"
+    (dest / "images" / "subdir").mkdir(parents=True)
+    (dest / "images" / "keepme.jpg").write_bytes(b"not ours")
+    manifest_path = str(dest / "manifest.json")
+
+    for name in ("000_signer1_aaaa", "001_signer2_bbbb"):
+        dataset(name)
+    manifest = load_export_manifest(manifest_path)
+    assert export(snapshot(["000_signer1_aaaa", "001_signer2_bbbb"]), dest, manifest) == (2, 0)
+    save_export_manifest(manifest_path, manifest)
+
+    # Unchanged pairs are skipped; a rerun from the saved manifest writes nothing.
+    manifest = load_export_manifest(manifest_path)
+    assert export(snapshot(), dest, manifest) == (0, 0)
+
+    # A pair that leaves the selection is removed, an edited one rewritten, foreign files kept.
+    os.remove(os.path.join(datasetManifest.LABELS_DIR, "001_signer2_bbbb.txt"))
+    label = os.path.join(datasetManifest.LABELS_DIR, "000_signer1_aaaa.txt")
+    with open(label, "w") as f:
+        f.write("0 0.2 0.2 0.1 0.1\n")
+    os.utime(label, ns=(1, 10 ** 18))
+    assert export(snapshot(), dest, manifest) == (1, 1)
+    assert sorted(os.listdir(dest / "images")) == ["000_signer1_aaaa.jpg", "keepme.jpg", "subdir"]
+    assert os.listdir(dest / "labels") == ["000_signer1_aaaa.txt"]
+    assert (dest / "labels" / "000_signer1_aaaa.txt").read_text() == "0 0.2 0.2 0.1 0.1\n"
+
+    # A file deleted by hand is written again even though its signature is unchanged.
+    os.remove(dest / "images" / "000_signer1_aaaa.jpg")
+    assert export(snapshot(), dest, manifest) == (1, 0)
+
+
+def test_export_manifest_from_another_format_starts_over(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    with open(path, "w") as f:
+        f.write('{"pairs": {"x": {}}}')
+    assert load_export_manifest(path, mode=None)["pairs"] == {}
+    assert load_export_manifest(str(tmp_path / "missing.json"), mode=None)["mode"] is None
@@ -0,0 +1,59 @@
+import pytest
+
+from dbHelper import get_connection
+from exportLedger import NOT_EXPORTED, record_export, record_result, result_status
+
+DESTINATION = "training"
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = get_connection(str(tmp_path / "autographs.db"))
+    yield conn
+    conn.close()
+
+
+def result(url, ok=False, status=None, error=None):
+    return {"url": url, "path": f"/tmp/{url[-1]}.jpg" if ok else None, "ok": ok,
+            "status": status, "bytes": 10 if ok else 0, "error": error}
+
+
+def pending(conn, destination=DESTINATION):
+    rows = conn.execute(f"SELECT a.img_url FROM autographs a WHERE {NOT_EXPORTED} ORDER BY a.img_url",
+                        (destination,)).fetchall()
+    return [url for (url,) in rows]
+
+
+def test_only_transient_failures_are_selected_again(conn):
+    urls = [f"https://i.ebayimg.com/{c}" for c in "abcdefgh"]
+    conn.executemany("INSERT INTO autographs (title, img_url) VALUES ('t', ?)", [(u,) for u in urls])
+    a, b, c, d, e, f, g, h = urls
+
+    record_result(conn, DESTINATION, result(a, ok=True, status=200))
+    record_result(conn, DESTINATION, result(b, status=404, error="HTTP 404"))
+    record_result(conn, DESTINATION, result(c, status=410, error="HTTP 410"))
+    record_result(conn, DESTINATION, result(d, status=503, error="HTTP 503"))
+    record_result(conn, DESTINATION, result(e, status=429, error="HTTP 429"))
+    record_result(conn, DESTINATION, result(f, error="Read timed out"))
+    record_export(conn, DESTINATION, g, "near_duplicate")
+
+    assert pending(conn) == [d, e, f, h]
+    assert pending(conn, "inference") == urls
+    statuses = dict(conn.execute("SELECT url, status FROM exports").fetchall())
+    assert statuses[b] == statuses[c] == "gone"
+    assert statuses[d] == statuses[f] == "failed"
+
+
+def test_a_retried_failure_that_succeeds_is_final(conn):
+    url = "https://i.ebayimg.com/a"
+    conn.execute("INSERT INTO autographs (title, img_url) VALUES ('t', ?)", (url,))
+    record_result(conn, DESTINATION, result(url, status=502, error="HTTP 502"))
+    assert pending(conn) == [url]
+    record_result(conn, DESTINATION, result(url, ok=True, status=200))
+    assert pending(conn) == []
+    assert conn.execute("SELECT status, error FROM exports").fetchone() == ("exported", None)
+
+
+def test_result_status_without_http_status():
+    assert result_status(result("u", ok=True)) == "exported"
+    assert result_status({"url": "u", "ok": False, "error": "link failed"}) == "failed"
@@ -0,0 +1,36 @@
+import pytest
+
+from priceHelper import parse_amount, parse_price
+
+
+@pytest.mark.parametrize("text, amount", [
+    ("12.99", 12.99),
+    ("12,50", 12.5),
+    ("1,234", 1234.0),
+    ("1.234", 1234.0),
+    ("1,234.50", 1234.5),
+    ("1.234,50", 1234.5),
+    ("1,234,567.89", 1234567.89),
+    ("1.234.567,89", 1234567.89),
+    ("20.", 20.0),
+    ("7", 7.0),
+])
+def test_parse_amount(text, amount):
+    assert parse_amount(text) == pytest.approx(amount)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("$12.99", (12.99, 12.99, "USD")),
+    ("US $1,234.50", (1234.5, 1234.5, "USD")),
+    ("EUR 1.234,50", (1234.5, 1234.5, "EUR")),
+    ("EUR 12,50", (12.5, 12.5, "EUR")),
+    ("£1,234.50", (1234.5, 1234.5, "GBP")),
+    ("$5.00 to $20.00", (5.0, 20.0, "USD")),
+    ("EUR 1.234,50 bis EUR 2.000,00", (1234.5, 2000.0, "EUR")),
+    ("C $1,000.00 to C $1,250.00", (1000.0, 1250.0, "CAD")),
+    ("N/A", (None, None, None)),
+    ("", (None, None, None)),
+    (None, (None, None, None)),
+])
+def test_parse_price(text, expected):
+    assert parse_price(text) == expected
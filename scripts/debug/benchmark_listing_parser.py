@@ -0,0 +1,154 @@
+# benchmark_listing_parser.py — offline parse-time / memory benchmark for listingParser
+#
+# Fixtures are saved eBay search result pages; data/fixtures/ebay ships small sanitized ones.
+# Collect real pages by running the scraper with
+#   EBAY_SAVE_HTML_DIR=data/fixtures/ebay python scripts/scraping/eBayScraping.py
+# A page with a <name>.expected.json next to it is also a regression check: --check compares
+# every parser's records (and the count of placeholder-thumbnail cards) against it.
+#
+# Memory is the growth of peak RSS while parsing one page, measured in a fresh process per
+# parser and page. tracemalloc only sees the Python heap, so it misses what libxml2 (lxml) and
+# Lexbor (selectolax) allocate in C — exactly the parsers this compares. A spawned child starts
+# from the parent's RSS high-water mark, so every probe runs before this process parses anything.
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, the memory column reads n/a
+    resource = None
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "../../"))
+sys.path.append(os.path.join(PROJECT_ROOT, "scripts", "scraping"))
+
+from listingParser import PARSERS, parse_listings, parse_listings_page
+
+FIXTURE_DIR = os.path.join(PROJECT_ROOT, "data", "fixtures", "ebay")
+CHECKED_FIELDS = ("title", "price", "img_url", "listing_url")
+
+
+def measure(parse, html, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        records = parse(html)
+        timings.append(time.perf_counter() - start)
+    return records, statistics.median(timings)
+
+
+def max_rss_kb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # macOS reports bytes, Linux KB
+
+
+def probe_rss(name, path):
+    """Runs in a fresh process: prints how much peak RSS one parse of `path` adds."""
+    with open(path, "r", encoding="utf-8") as f:
+        html = f.read()
+    parse_listings("<html><body></body></html>", parser=name)  # load the parser library first
+    before = max_rss_kb()
+    records = parse_listings(html, parser=name)
+    print(max_rss_kb() - before, len(records))
+
+
+def peak_rss_kb(name, path):
+    """Peak RSS growth in KB for parsing `path` with `name`, or None where it can't be measured."""
+    if resource is None:
+        return None
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--probe-rss", name, path],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()
+        print(f"⚠️ RSS probe failed for {name} on {os.path.basename(path)}: {error[-1] if error else result.returncode}")
+        return None
+    return int(result.stdout.split()[0])
+
+
+def check(pages, names):
+    """Compare each parser with <page>.expected.json; returns the number of mismatches."""
+    failures = 0
+    for path in pages:
+        expected_path = os.path.splitext(path)[0] + ".expected.json"
+        if not os.path.exists(expected_path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            html = f.read()
+        with open(expected_path, "r", encoding="utf-8") as f:
+            expected = json.load(f)
+
+        for name in names:
+            records, lazy = parse_listings_page(html, parser=name)
+            got = [{field: record[field] for field in CHECKED_FIELDS} for record in records]
+            if got == expected["listings"] and lazy == expected.get("lazy", 0):
+                print(f"✅ {os.path.basename(path)} [{name}]: {len(got)} listings, {lazy} placeholder cards")
+                continue
+            failures += 1
+            print(f"❌ {os.path.basename(path)} [{name}]: expected {len(expected['listings'])} listings / "
+                  f"{expected.get('lazy', 0)} placeholder cards, got {len(got)} / {lazy}")
+            for want, have in zip(expected["listings"], got):
+                if want != have:
+                    print(f"   expected {want}\n   got      {have}")
+                    break
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark listing parsers on saved eBay result pages")
+    parser.add_argument("fixtures", nargs="?", default=FIXTURE_DIR, help="directory of saved .html pages")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per page (median is reported)")
+    parser.add_argument("--parser", choices=sorted(PARSERS), action="append", help="limit to these parsers")
+    parser.add_argument("--check", action="store_true", help="only compare against .expected.json files")
+    parser.add_argument("--probe-rss", nargs=2, metavar=("PARSER", "PAGE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe_rss:
+        probe_rss(*args.probe_rss)
+        return
+
+    pages = sorted(glob.glob(os.path.join(args.fixtures, "*.html")))
+    if not pages:
+        print(f"❌ No .html fixtures in {args.fixtures}")
+        print("   Save some with EBAY_SAVE_HTML_DIR=<dir> python scripts/scraping/eBayScraping.py")
+        sys.exit(1)
+
+    names = args.parser or list(PARSERS)
+    if args.check:
+        failures = check(pages, names)
+        sys.exit(1 if failures else 0)
+
+    print(f"📄 {len(pages)} fixture pages, parsers: {', '.join(names)}\n")
+    peaks = {(path, name): peak_rss_kb(name, path) for path in pages for name in names}
+    totals = {name: 0.0 for name in names}
+    print(f"{'page':<32} {'parser':<11} {'listings':>8} {'ms/page':>9} {'peak RSS KB':>12}")
+
+    for path in pages:
+        with open(path, "r", encoding="utf-8") as f:
+            html = f.read()
+
+        counts = {}
+        for name in names:
+            records, seconds = measure(
+                lambda page, name=name: parse_listings(page, parser=name), html, args.repeat)
+            counts[name] = len(records)
+            totals[name] += seconds
+            peak = peaks[path, name]
+            print(f"{os.path.basename(path)[:32]:<32} {name:<11} {len(records):>8} "
+                  f"{seconds * 1000:>9.2f} {'n/a' if peak is None else peak:>12}")
+
+        if len(set(counts.values())) > 1:
+            print(f"⚠️ Parsers disagree on listing count for {os.path.basename(path)}: {counts}")
+
+    print()
+    for name in names:
+        print(f"⏱️ {name}: {totals[name] / len(pages) * 1000:.2f} ms/page on average")
+
+
+if __name__ == "__main__":
+    main()
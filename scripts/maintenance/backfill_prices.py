@@ -0,0 +1,59 @@
+# backfill_prices.py — fill price_min / price_max / price_currency for rows saved before they existed
+#
+# Works through autographs in id order, one committed chunk at a time, and keeps its place in
+# sync_cursors, so it can be stopped and re-run at any point while the scraper keeps writing.
+import argparse
+import os
+import sys
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "../../"))
+sys.path.append(os.path.join(PROJECT_ROOT, "scripts", "common"))
+
+from dbHelper import get_connection, load_cursor, save_cursor
+from priceHelper import parse_price
+
+CURSOR_NAME = "backfill_prices"
+CHUNK_SIZE = 5000
+
+
+def backfill_prices(chunk_size=CHUNK_SIZE, restart=False):
+    conn = get_connection()
+    try:
+        cursor = 0 if restart else load_cursor(conn, CURSOR_NAME)
+        if cursor:
+            print(f"🔁 Resuming price backfill after autographs.id {cursor}")
+
+        updated = 0
+        started = time.monotonic()
+        while True:
+            rows = conn.execute(
+                "SELECT id, price FROM autographs WHERE id > ? ORDER BY id LIMIT ?",
+                (cursor, chunk_size)).fetchall()
+            if not rows:
+                break
+
+            conn.executemany(
+                "UPDATE autographs SET price_min = ?, price_max = ?, price_currency = ? WHERE id = ?",
+                [(*parse_price(price), row_id) for row_id, price in rows])
+            cursor = rows[-1][0]
+            save_cursor(conn, CURSOR_NAME, cursor)
+            conn.commit()  # one short write transaction per chunk
+
+            updated += len(rows)
+            print(f"✅ {updated} rows backfilled (through id {cursor}, {time.monotonic() - started:.1f}s)")
+
+        print(f"🏁 Price backfill complete: {updated} rows this run")
+        return updated
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill numeric price columns from autographs.price")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows per committed chunk")
+    parser.add_argument("--restart", action="store_true", help="ignore the saved cursor and start from the first row")
+    args = parser.parse_args()
+
+    backfill_prices(chunk_size=args.chunk_size, restart=args.restart)
@@ -0,0 +1,105 @@
+# canonicalize_listing_urls.py — rewrite autographs.listing_url to canonical item URLs and merge duplicates
+#
+# Rows saved before ingest canonicalization carry slugs and tracking query strings, so one eBay
+# item can appear many times. Works through autographs in id order, one committed chunk at a time,
+# with its place kept in sync_cursors; memory stays bounded by --chunk-size and a rerun resumes.
+import argparse
+import os
+import sys
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "../../"))
+sys.path.append(os.path.join(PROJECT_ROOT, "scripts", "common"))
+
+from dbHelper import get_connection, load_cursor, save_cursor
+from listingUrl import canonicalize_many
+
+CURSOR_NAME = "canonicalize_listing_urls"
+CHUNK_SIZE = 2000
+
+
+def merge_into(conn, duplicate_id, keeper_id):
+    """Moves everything that references `duplicate_id` onto `keeper_id`, then deletes it."""
+    # Sightings: the keeper's own row wins when both were seen in the same run.
+    conn.execute("UPDATE OR IGNORE listing_observations SET autograph_id = ? WHERE autograph_id = ?",
+                 (keeper_id, duplicate_id))
+    conn.execute("DELETE FROM listing_observations WHERE autograph_id = ?", (duplicate_id,))
+
+    # Compacted history: add the duplicate's aggregates to the keeper's.
+    conn.execute('''INSERT INTO listing_price_summary (
+                        autograph_id, observations, priced_observations, first_seen, last_seen,
+                        price_low, price_high, price_sum, updated_at)
+                    SELECT ?, observations, priced_observations, first_seen, last_seen,
+                           price_low, price_high, price_sum, updated_at
+                    FROM listing_price_summary WHERE autograph_id = ?
+                    ON CONFLICT(autograph_id) DO UPDATE SET
+                        observations = observations + excluded.observations,
+                        priced_observations = priced_observations + excluded.priced_observations,
+                        first_seen = MIN(first_seen, excluded.first_seen),
+                        last_seen = MAX(last_seen, excluded.last_seen),
+                        price_low = COALESCE(MIN(price_low, excluded.price_low), price_low, excluded.price_low),
+                        price_high = COALESCE(MAX(price_high, excluded.price_high), price_high, excluded.price_high),
+                        price_sum = COALESCE(price_sum, 0) + COALESCE(excluded.price_sum, 0),
+                        updated_at = excluded.updated_at''',
+                 (keeper_id, duplicate_id))
+    conn.execute("DELETE FROM listing_price_summary WHERE autograph_id = ?", (duplicate_id,))
+
+    # The keeper takes the most recent sighting of the two.
+    conn.execute('''UPDATE autographs SET
+                        last_seen = d.last_seen,
+                        run_id = d.run_id
+                    FROM (SELECT last_seen, run_id FROM autographs WHERE id = ?) AS d
+                    WHERE autographs.id = ? AND d.last_seen > COALESCE(autographs.last_seen, '')''',
+                 (duplicate_id, keeper_id))
+    conn.execute("DELETE FROM autographs WHERE id = ?", (duplicate_id,))
+
+
+def canonicalize_listing_urls(chunk_size=CHUNK_SIZE, restart=False):
+    conn = get_connection()
+    try:
+        cursor = 0 if restart else load_cursor(conn, CURSOR_NAME)
+        if cursor:
+            print(f"🔁 Resuming after autographs.id {cursor}")
+
+        scanned = rewritten = merged = 0
+        started = time.monotonic()
+        while True:
+            rows = conn.execute(
+                '''SELECT id, listing_url FROM autographs
+                   WHERE id > ? AND listing_url IS NOT NULL ORDER BY id LIMIT ?''',
+                (cursor, chunk_size)).fetchall()
+            if not rows:
+                break
+
+            changed = [(row_id, canonical) for (row_id, url), canonical
+                       in zip(rows, canonicalize_many([url for _, url in rows])) if canonical != url]
+            with conn:
+                for row_id, canonical in changed:
+                    keeper = conn.execute("SELECT id FROM autographs WHERE listing_url = ?", (canonical,)).fetchone()
+                    if keeper:
+                        merge_into(conn, row_id, keeper[0])
+                        merged += 1
+                    else:
+                        conn.execute("UPDATE autographs SET listing_url = ? WHERE id = ?", (canonical, row_id))
+                        rewritten += 1
+                cursor = rows[-1][0]
+                save_cursor(conn, CURSOR_NAME, cursor)
+
+            scanned += len(rows)
+            print(f"✅ {scanned} rows scanned: {rewritten} rewritten, {merged} merged "
+                  f"(through id {cursor}, {time.monotonic() - started:.1f}s)")
+
+        print(f"🏁 Done: {rewritten} URLs rewritten, {merged} duplicate listings merged")
+        return rewritten, merged
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Canonicalize listing URLs to eBay item IDs and merge duplicates")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows per committed chunk")
+    parser.add_argument("--restart", action="store_true", help="ignore the saved cursor and start from the first row")
+    args = parser.parse_args()
+
+    canonicalize_listing_urls(chunk_size=args.chunk_size, restart=args.restart)
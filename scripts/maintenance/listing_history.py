@@ -0,0 +1,123 @@
+# listing_history.py — compact and summarize listing_observations
+#
+#   compact    roll observations older than --older-than days into listing_price_summary,
+#              one run per transaction, then delete the raw rows
+#   summarize  observation counts per run, or the full price history of one listing (--listing)
+#
+# History queries should use the listing_price_history view, which merges compacted aggregates with raw rows.
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "../../"))
+sys.path.append(os.path.join(PROJECT_ROOT, "scripts", "common"))
+
+from dbHelper import get_connection
+
+KEEP_DAYS = 90
+RECENT_RUNS = 10
+
+ROLL_UP = '''
+    INSERT INTO listing_price_summary (
+        autograph_id, observations, priced_observations, first_seen, last_seen,
+        price_low, price_high, price_sum, updated_at)
+    SELECT autograph_id, COUNT(*), COUNT(price_min), MIN(observed_at), MAX(observed_at),
+           MIN(price_min), MAX(price_max), SUM((price_min + price_max) / 2.0), ?
+    FROM listing_observations
+    WHERE run_id = ? AND observed_at < ?
+    GROUP BY autograph_id
+    ON CONFLICT(autograph_id) DO UPDATE SET
+        observations = observations + excluded.observations,
+        priced_observations = priced_observations + excluded.priced_observations,
+        first_seen = MIN(first_seen, excluded.first_seen),
+        last_seen = MAX(last_seen, excluded.last_seen),
+        price_low = COALESCE(MIN(price_low, excluded.price_low), price_low, excluded.price_low),
+        price_high = COALESCE(MAX(price_high, excluded.price_high), price_high, excluded.price_high),
+        price_sum = COALESCE(price_sum, 0) + COALESCE(excluded.price_sum, 0),
+        updated_at = excluded.updated_at
+'''
+
+
+def compact(older_than_days=KEEP_DAYS):
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=older_than_days)
+    conn = get_connection()
+    try:
+        runs = [row[0] for row in conn.execute(
+            "SELECT DISTINCT run_id FROM listing_observations WHERE observed_at < ? ORDER BY run_id",
+            (cutoff,))]
+        if not runs:
+            print(f"✅ Nothing older than {older_than_days} days to compact.")
+            return 0
+
+        print(f"🗜️ Compacting observations older than {cutoff:%Y-%m-%d} from {len(runs)} runs...")
+        compacted = 0
+        for run_id in runs:
+            # Roll-up and delete commit together, so an interrupted compaction never double counts.
+            with conn:
+                conn.execute(ROLL_UP, (now, run_id, cutoff))
+                deleted = conn.execute(
+                    "DELETE FROM listing_observations WHERE run_id = ? AND observed_at < ?",
+                    (run_id, cutoff)).rowcount
+            compacted += deleted
+            print(f"✅ Run {run_id}: {deleted} observations rolled up")
+
+        print(f"🏁 Compacted {compacted} observations")
+        return compacted
+    finally:
+        conn.close()
+
+
+def summarize(listing_id=None, recent_runs=RECENT_RUNS):
+    with get_connection() as conn:
+        if listing_id is not None:
+            row = conn.execute(
+                '''SELECT a.title, h.observations, h.first_seen, h.last_seen, h.price_low, h.price_high, h.price_avg
+                   FROM listing_price_history h JOIN autographs a ON a.id = h.autograph_id
+                   WHERE h.autograph_id = ?''', (listing_id,)).fetchone()
+            if not row:
+                print(f"❌ No observations for listing {listing_id}")
+                return
+            title, observations, first_seen, last_seen, low, high, avg = row
+            print(f"📈 {title}")
+            print(f"   {observations} sightings from {first_seen} to {last_seen}")
+            if avg is not None:
+                print(f"   price {low:.2f} – {high:.2f}, average {avg:.2f}")
+            for run_id, observed_at, price in conn.execute(
+                    '''SELECT run_id, observed_at, price FROM listing_observations
+                       WHERE autograph_id = ? ORDER BY observed_at''', (listing_id,)):
+                print(f"   run {run_id:>5}  {observed_at}  {price}")
+            return
+
+        raw = conn.execute("SELECT COUNT(*) FROM listing_observations").fetchone()[0]
+        compacted, rolled_up = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(observations), 0) FROM listing_price_summary").fetchone()
+        print(f"📊 {raw} raw observations; {rolled_up} more compacted into {compacted} listing summaries")
+
+        print(f"\n{'run':>6} {'observations':>13} {'priced':>8} {'avg price':>10}")
+        for run_id, count, priced, avg in conn.execute(
+                '''SELECT run_id, COUNT(*), COUNT(price_min), AVG((price_min + price_max) / 2.0)
+                   FROM listing_observations GROUP BY run_id ORDER BY run_id DESC LIMIT ?''',
+                (recent_runs,)):
+            print(f"{run_id:>6} {count:>13} {priced:>8} {avg if avg is not None else 0:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact and summarize listing price history")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compact_parser = commands.add_parser("compact", help="roll old observations into per-listing aggregates")
+    compact_parser.add_argument("--older-than", type=int, default=KEEP_DAYS, metavar="DAYS",
+                                help="keep raw observations newer than this")
+
+    summarize_parser = commands.add_parser("summarize", help="print observation counts or one listing's history")
+    summarize_parser.add_argument("--listing", type=int, help="autographs.id to show the history of")
+    summarize_parser.add_argument("--runs", type=int, default=RECENT_RUNS, help="recent runs to list")
+    args = parser.parse_args()
+
+    if args.command == "compact":
+        compact(args.older_than)
+    else:
+        summarize(args.listing, args.runs)
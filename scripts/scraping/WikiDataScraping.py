@@ -1,15 +1,26 @@
 import requests
+import argparse
 import time
 import json
+import sys
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+
+from dbHelper import get_connection, load_cursor, save_cursor
+from rateLimiter import TokenBucket
 
 HEADERS = {
     "User-Agent": "AutographReaderBot/1.0 (mailto:your-email@example.com)"
 }
 
-CONFIG_DIR = "config"
-SIGNER_FILE = os.path.join(CONFIG_DIR, "known_signers.json")
-META_FILE = os.path.join(CONFIG_DIR, "signers_meta.json")
+SPARQL_ENDPOINT = os.environ.get("WIKIDATA_SPARQL_ENDPOINT", "https://query.wikidata.org/sparql")
+ENTITY_PREFIX = "http://www.wikidata.org/entity/Q"
+CURSOR_PREFIX = "wikidata_signers"  # one cursor per occupation: wikidata_signers:<QID>
+SPARQL_CONCURRENCY = 3  # WDQS allows a handful of parallel queries per client
+SPARQL_REQUESTS_PER_SECOND = 1.0
 
 OCCUPATION_QID_MAP = {
     # "actor": "Q33999",
@@ -32,95 +43,171 @@ OCCUPATION_QID_MAP = {
 }
 
 
-def fetch_known_signers(limit_per_page=250, retries=3, backoff=2, full_refresh=False):
-    occupation_filter = ", ".join(f"wd:{qid}" for qid in OCCUPATION_QID_MAP.values())
-
-    # Load existing signer list and metadata
-    if not full_refresh and os.path.exists(SIGNER_FILE):
-        with open(SIGNER_FILE, "r", encoding="utf-8") as f:
-            all_names = set(json.load(f))
-        start_page = 1
-        if os.path.exists(META_FILE):
-            with open(META_FILE, "r", encoding="utf-8") as f:
-                meta = json.load(f)
-                start_page = meta.get("last_page", 1)
-        print(f"🔁 Incremental update starting from page {start_page}")
-    else:
-        all_names = set()
-        start_page = 0
-        print("🧼 Full refresh — starting from page 0")
-
-    page = start_page
-    consecutive_skips = 0
-    max_skips = 5
-
-    while True:
-        offset = page * limit_per_page
-        query = f"""
-        SELECT DISTINCT ?personLabel WHERE {{
-            ?person wdt:P31 wd:Q5;
-                    wdt:P106 ?occupation;
-                    wdt:P27 wd:Q30.  # Only U.S. citizens
-            FILTER(?occupation IN ({occupation_filter}))
-            SERVICE wikibase:label {{ bd:serviceParam wikibase:language "[AUTO_LANGUAGE],en". }}
-        }}
-        LIMIT {limit_per_page}
-        OFFSET {offset}
-        """
-
-        page_results = set()
-        success = False
-
-        for attempt in range(retries):
-            try:
-                response = requests.get(
-                    "https://query.wikidata.org/sparql",
-                    params={"query": query, "format": "json"},
-                    headers=HEADERS,
-                    timeout=60
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    page_results = {
-                        item["personLabel"]["value"].strip().lower()
-                        for item in data["results"]["bindings"]
-                        if "personLabel" in item
-                    }
-                    print(f"✅ Page {page}: {len(page_results)} signers")
-                    all_names.update(page_results)
-                    success = True
-
-                    # Save after each successful page
-                    with open(SIGNER_FILE, "w", encoding="utf-8") as f:
-                        json.dump(sorted(all_names), f, indent=2, ensure_ascii=False)
-                    with open(META_FILE, "w", encoding="utf-8") as f:
-                        json.dump({"last_page": page + 1}, f, indent=2)
-
+def build_query(occupation_qid, after_qnum, limit):
+    # Keyset pagination: walk entities in QID order instead of using deep OFFSETs.
+    return f"""
+    SELECT DISTINCT ?person ?personLabel ?qnum WHERE {{
+        ?person wdt:P31 wd:Q5;
+                wdt:P106 wd:{occupation_qid};
+                wdt:P27 wd:Q30.  # Only U.S. citizens
+        BIND(xsd:integer(STRAFTER(STR(?person), "{ENTITY_PREFIX}")) AS ?qnum)
+        FILTER(?qnum > {after_qnum})
+        SERVICE wikibase:label {{ bd:serviceParam wikibase:language "[AUTO_LANGUAGE],en". }}
+    }}
+    ORDER BY ?qnum
+    LIMIT {limit}
+    """
+
+
+def parse_bindings(data):
+    """SPARQL JSON results -> sorted [(qnum, qid, label)]."""
+    rows = {}
+    for item in data["results"]["bindings"]:
+        if "person" not in item or "personLabel" not in item:
+            continue
+        uri = item["person"]["value"]
+        if not uri.startswith(ENTITY_PREFIX):
+            continue
+        qnum = int(uri[len(ENTITY_PREFIX):])
+        rows[qnum] = (qnum, f"Q{qnum}", item["personLabel"]["value"].strip())
+    return [rows[q] for q in sorted(rows)]
+
+
+class HttpSparqlEndpoint:
+    def __init__(self, url=SPARQL_ENDPOINT, timeout=60):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch_page(self, occupation_qid, after_qnum, limit):
+        response = requests.get(
+            self.url,
+            params={"query": build_query(occupation_qid, after_qnum, limit), "format": "json"},
+            headers=HEADERS,
+            timeout=self.timeout
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}")
+        return parse_bindings(response.json())
+
+
+class FixtureSparqlEndpoint:
+    """
+    Offline stand-in for the SPARQL endpoint. Serves a saved SPARQL JSON result
+    (bindings with ?person and ?personLabel, optionally ?occupation) with the same
+    cursor/limit semantics as the live query.
+    """
+
+    def __init__(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.rows = []
+        for item in data["results"]["bindings"]:
+            occupation = item.get("occupation", {}).get("value", "").rsplit("/", 1)[-1] or None
+            for qnum, qid, label in parse_bindings({"results": {"bindings": [item]}}):
+                self.rows.append((qnum, qid, label, occupation))
+
+    def fetch_page(self, occupation_qid, after_qnum, limit):
+        matches = {}
+        for qnum, qid, label, occupation in self.rows:
+            if qnum > after_qnum and occupation in (None, occupation_qid):
+                matches[qnum] = (qnum, qid, label)
+        return [matches[q] for q in sorted(matches)[:limit]]
+
+
+def save_signers(conn, rows):
+    now = datetime.now(timezone.utc)
+    conn.executemany(
+        '''INSERT INTO signers_ref (qid, label, name, updated_at) VALUES (?, ?, ?, ?)
+           ON CONFLICT(qid) DO UPDATE SET
+               label = excluded.label,
+               name = excluded.name,
+               updated_at = excluded.updated_at''',
+        [(qid, label, label.lower(), now) for _, qid, label in rows],
+    )
+
+
+def sync_occupation(occupation, occupation_qid, endpoint, limiter,
+                    limit_per_page=250, retries=3, backoff=2, full_refresh=False):
+    cursor_name = f"{CURSOR_PREFIX}:{occupation_qid}"
+    conn = get_connection()
+    try:
+        # The cursor is the highest QID stored for this occupation; a normal run only picks up
+        # newer entities. Use full_refresh to re-walk everything (existing rows are upserted).
+        cursor = 0 if full_refresh else load_cursor(conn, cursor_name)
+        if cursor:
+            print(f"🔁 {occupation}: incremental update starting after Q{cursor}")
+        else:
+            print(f"🧼 {occupation}: full refresh — starting from the first QID")
+
+        page = 0
+        fetched = 0
+        while True:
+            rows = None
+            for attempt in range(retries):
+                limiter.acquire()
+                try:
+                    rows = endpoint.fetch_page(occupation_qid, cursor, limit_per_page)
                     break
-                else:
-                    print(f"⚠️ HTTP {response.status_code} on attempt {attempt + 1}")
-            except Exception as e:
-                print(f"⚠️ Attempt {attempt + 1} failed: {e}")
-            time.sleep(backoff * (attempt + 1))
-
-        if not success:
-            print(f"⏭️ Skipping page {page} after {retries} failed attempts.")
-            consecutive_skips += 1
-            if consecutive_skips >= max_skips:
-                print(f"🛑 Aborting: {consecutive_skips} pages skipped in a row.")
+                except Exception as e:
+                    print(f"⚠️ {occupation}: attempt {attempt + 1} failed: {e}")
+                time.sleep(backoff * (attempt + 1))
+
+            if rows is None:
+                # Keyset pages can't be skipped; stop here and resume from the cursor next run.
+                print(f"🛑 {occupation}: aborting after {retries} failed attempts — next run resumes after Q{cursor}.")
                 break
-        elif len(page_results) < limit_per_page:
-            print(f"📉 Page {page} had fewer than {limit_per_page} entries — stopping.")
-            break
-        else:
-            consecutive_skips = 0
 
-        page += 1
-        time.sleep(1)
+            if rows:
+                save_signers(conn, rows)
+                cursor = rows[-1][0]
+                save_cursor(conn, cursor_name, cursor)
+                conn.commit()
+                fetched += len(rows)
+            print(f"✅ {occupation} page {page}: {len(rows)} signers (through Q{cursor})")
+
+            if len(rows) < limit_per_page:
+                break
+            page += 1
+        return fetched
+    finally:
+        conn.close()
+
+
+def fetch_known_signers(limit_per_page=250, retries=3, backoff=2, full_refresh=False, endpoint=None,
+                        concurrency=SPARQL_CONCURRENCY, requests_per_second=SPARQL_REQUESTS_PER_SECOND):
+    endpoint = endpoint or HttpSparqlEndpoint()
+    limiter = TokenBucket(requests_per_second, capacity=concurrency)
+
+    # Each occupation is its own partition with its own cursor; signers_ref's QID key merges overlaps.
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(sync_occupation, occupation, qid, endpoint, limiter,
+                            limit_per_page, retries, backoff, full_refresh): occupation
+            for occupation, qid in OCCUPATION_QID_MAP.items()
+        }
+        for future in as_completed(futures):
+            occupation = futures[future]
+            try:
+                print(f"🏁 {occupation}: {future.result()} signers fetched")
+            except Exception as e:
+                print(f"❌ {occupation}: sync failed: {e}")
+
+    with get_connection() as conn:
+        all_names = {row[0] for row in conn.execute("SELECT name FROM signers_ref")}
 
     print(f"✅ Final signer count: {len(all_names)}")
     return all_names
 
 # Optional CLI entry
 if __name__ == "__main__":
-    fetch_known_signers()
+    parser = argparse.ArgumentParser(description="Sync known signers from WikiData into signers_ref")
+    parser.add_argument("--full-refresh", action="store_true", help="re-walk every QID from the start")
+    parser.add_argument("--endpoint", default=SPARQL_ENDPOINT, help="SPARQL endpoint URL")
+    parser.add_argument("--fixture", help="serve results from a saved SPARQL JSON file instead (offline)")
+    parser.add_argument("--concurrency", type=int, default=SPARQL_CONCURRENCY, help="occupations fetched in parallel")
+    parser.add_argument("--rate", type=float, default=SPARQL_REQUESTS_PER_SECOND, help="max SPARQL requests per second")
+    args = parser.parse_args()
+
+    endpoint = FixtureSparqlEndpoint(args.fixture) if args.fixture else HttpSparqlEndpoint(args.endpoint)
+    fetch_known_signers(full_refresh=args.full_refresh, endpoint=endpoint,
+                        concurrency=args.concurrency, requests_per_second=args.rate)
@@ -0,0 +1,112 @@
+# driverPool.py
+import queue
+import threading
+from contextlib import contextmanager
+
+import undetected_chromedriver as uc
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException
+
+from scrapeHelper import apply_scrape_options, get_random_proxy, get_random_user_agent
+
+
+class _PooledDriver:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+
+class DriverPool:
+    """
+    Keeps long-lived Chrome drivers around so a page borrows a warm browser
+    instead of paying for a cold start. Drivers are recycled after
+    `max_pages` pages, or as soon as the session dies or a health check fails.
+    A borrower's error alone (e.g. a wait timing out) doesn't cost a cold start.
+    """
+
+    # Errors that mean the browser session itself is gone, no health check needed.
+    DEAD_SESSION_ERRORS = (InvalidSessionIdException, NoSuchWindowException)
+
+    def __init__(self, size=1, max_pages=25, version_main=136, page_load_timeout=20):
+        self.size = size
+        self.max_pages = max_pages
+        self.version_main = version_main
+        self.page_load_timeout = page_load_timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+
+    def _launch(self):
+        proxy = get_random_proxy()
+        user_agent = get_random_user_agent()
+        print(f"🚀 Launching Chrome (proxy: {proxy})")
+        print(f"🧠 Using User-Agent: {user_agent}")
+
+        options = uc.ChromeOptions()
+        options = apply_scrape_options(options, proxy=proxy, user_agent=user_agent)
+        driver = uc.Chrome(version_main=self.version_main, options=options)
+        driver.set_page_load_timeout(self.page_load_timeout)
+        return _PooledDriver(driver)
+
+    def _is_healthy(self, pooled):
+        try:
+            return pooled.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _retire(self, pooled, reason):
+        print(f"♻️ Retiring Chrome driver after {pooled.pages} pages ({reason})")
+        try: pooled.driver.quit()
+        except: pass
+
+    def _take(self):
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                return self._launch()
+            if self._is_healthy(pooled):
+                return pooled
+            self._retire(pooled, "failed health check")
+
+    @contextmanager
+    def borrow(self):
+        if self._closed:
+            raise RuntimeError("DriverPool is closed")
+
+        self._slots.acquire()
+        pooled = None
+        crashed = False
+        try:
+            pooled = self._take()
+            yield pooled.driver
+        except Exception as e:
+            crashed = pooled is not None and (
+                isinstance(e, self.DEAD_SESSION_ERRORS) or not self._is_healthy(pooled))
+            raise
+        finally:
+            if pooled is not None:
+                pooled.pages += 1
+                if crashed:
+                    self._retire(pooled, "session died while in use")
+                elif pooled.pages >= self.max_pages:
+                    self._retire(pooled, "page limit reached")
+                elif self._closed:
+                    self._retire(pooled, "pool closed")
+                else:
+                    self._idle.put(pooled)
+            self._slots.release()
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._retire(pooled, "pool closed")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,43 +1,55 @@
 import requests
-import undetected_chromedriver as uc
+from requests.adapters import HTTPAdapter
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
-from urllib.parse import urlparse, urlunparse, parse_qs
-from bs4 import BeautifulSoup
 from datetime import datetime, timezone
+import argparse
 import time
-import sqlite3
+import sys
 import os
-import re
 import json
 
-from scrapeHelper import apply_scrape_options, get_random_proxy, get_random_user_agent, test_proxy_connectivity
-
-# Before initializing driver:
-proxy = get_random_proxy()
-user_agent = get_random_user_agent()
-print(f"🌟 Using proxy: {proxy}")
-print(f"🧠 Using User-Agent: {user_agent}")
-
-options = uc.ChromeOptions()
-options = apply_scrape_options(options, proxy=proxy, user_agent=user_agent)
-driver = uc.Chrome(version_main=136, options=options)
-
-sqlite3.register_adapter(datetime, lambda val: val.isoformat())
-sqlite3.register_converter("timestamp", lambda val: datetime.fromisoformat(val.decode("utf-8")))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+
+from dbHelper import DB_PATH, get_connection
+from driverPool import DriverPool
+from listingParser import parse_listings_page
+from listingUrl import canonicalize_many
+from pacing import AdaptivePacer, ThrottledError, THROTTLE_STATUSES
+from priceHelper import parse_price
+from rateLimiter import HostRateLimiter
+from scrapeHelper import get_random_user_agent
+from scrapeScheduler import run_page_scheduler
+from seenUrls import SeenUrls
+from signerMatcher import load_or_build_matcher
+from wikidataResolver import WikidataResolver
 
 # --- Constants ---
 CONFIG_DIR = "config"
-DB_PATH = os.path.join("database", "autographs.db")
-CACHE_FILE = os.path.join(CONFIG_DIR, "signer_cache.json")
 KNOWN_SIGNERS_FILE = os.path.join(CONFIG_DIR, "known_signers.json")
+SIGNER_MATCHER_FILE = os.path.join(CONFIG_DIR, "signer_matcher.pkl")
+SEEN_URLS_FILE = os.path.join(CONFIG_DIR, "seen_urls.bloom")
+FETCHED_URLS_FILE = os.path.join(CONFIG_DIR, "fetched_urls.bloom")
 BASE_SEARCH_URL = "https://www.ebay.com/sch/i.html?_nkw={query}&_sacat={category_id}&_pgn={page}"
 SEARCH_QUERY = "autograph"
-WIKIDATA_SEARCH_URL = "https://www.wikidata.org/w/api.php"
 MAX_RESULTS = 5000
-HEADERS = {"User-Agent": "Mozilla/5.0"}
+SCRAPE_WORKERS = 3  # pages fetched in parallel
+DRIVER_POOL_SIZE = SCRAPE_WORKERS
+DRIVER_MAX_PAGES = 25  # recycle each Chrome instance after this many pages
+PAGES_PER_MINUTE_PER_HOST = 6  # starting rate; AdaptivePacer moves it between the bounds below
+MIN_PAGES_PER_MINUTE = 2
+MAX_PAGES_PER_MINUTE = 30
+PAGE_BURST_PER_HOST = 2
+MAX_CONSECUTIVE_FAILURES = 3
+MAX_SEEN_PAGES = 3  # stop a category after this many pages in a row with nothing new
+# "http" fetches result pages with plain requests and only renders in Chrome when no
+# listing cards come back; "browser" always renders in Chrome.
+FETCH_MODE = "http"
+HTTP_TIMEOUT = 20
+# Set to a directory to keep every fetched results page as a parser benchmark fixture.
+SAVE_HTML_DIR = os.environ.get("EBAY_SAVE_HTML_DIR")
 
 CATEGORY_MAP = {
     "sports_mem": "64482",
@@ -63,188 +75,210 @@ CATEGORY_MAP = {
     # "philately": "260"
 }
 
-wikidata_cache = {}
-if os.path.exists(CACHE_FILE):
-    with open(CACHE_FILE, "r", encoding="utf-8") as f:
-        wikidata_cache = json.load(f)
-
 def load_known_signers(path=KNOWN_SIGNERS_FILE):
+    # Signers synced by WikiDataScraping live in signers_ref; the JSON list is the legacy fallback.
+    with get_connection() as conn:
+        names = {row[0] for row in conn.execute("SELECT name FROM signers_ref")}
+    if names or not os.path.exists(path):
+        return names
     with open(path, "r", encoding="utf-8") as f:
         return set(json.load(f))
 
 known_signers = load_known_signers()
+signer_matcher = load_or_build_matcher(known_signers, SIGNER_MATCHER_FILE)
+wikidata_resolver = WikidataResolver()
+seen_urls = SeenUrls(SEEN_URLS_FILE)  # loaded in __main__, once per run
+# Every listing fetched, saved or not, so Unknown-signer titles aren't re-resolved each run.
+fetched_urls = SeenUrls(FETCHED_URLS_FILE, from_db=False)
+driver_pool = DriverPool(size=DRIVER_POOL_SIZE, max_pages=DRIVER_MAX_PAGES)
+host_limiter = HostRateLimiter(PAGES_PER_MINUTE_PER_HOST / 60, PAGE_BURST_PER_HOST)
+pacer = AdaptivePacer(host_limiter, MIN_PAGES_PER_MINUTE, MAX_PAGES_PER_MINUTE)
+
+http_session = requests.Session()
+http_session.mount("https://", HTTPAdapter(pool_connections=SCRAPE_WORKERS, pool_maxsize=SCRAPE_WORKERS))
+http_session.headers.update({
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+})
+
+def detect_signers(titles):
+    results = {}
+    unmatched = []
+    for title in titles:
+        name = signer_matcher.best_match(title)
+        if name:
+            results[title] = (name, 1.0)
+        else:
+            unmatched.append(title)
+
+    # Everything the local matcher missed goes to Wikidata in batches.
+    if unmatched:
+        results.update(wikidata_resolver.resolve_many(unmatched))
+    return results
 
-def normalize_phrase(text):
-    return re.sub(r'\W+', ' ', text).strip().lower()
-
-def validate_with_wikidata(name):
-    print(f"🔎 Validating name with Wikidata: {name}")
-    normalized = normalize_phrase(name)
-
-    if normalized in wikidata_cache:
-        result = wikidata_cache[normalized]
-        print(f"⚡ Cache hit: {normalized} → {result}")
-        return result, 0.75 if result != "Unknown" else 0.0
-
-    params = {
-        "action": "wbsearchentities",
-        "format": "json",
-        "language": "en",
-        "search": name
-    }
+def build_url(query, category_id, page=1):
+    return BASE_SEARCH_URL.format(query=query, category_id=category_id, page=page)
 
+def mark_seen(listings_on_page):
+    # In-memory check against earlier runs, so known listings never reach signer detection.
+    for item in listings_on_page:
+        url = item["listing_url"]
+        item["seen"] = url in seen_urls or url in fetched_urls
+    return listings_on_page
+
+def page_fully_seen(listings_on_page):
+    return all(item["seen"] for item in listings_on_page)
+
+def fetch_html(url):
+    response = http_session.get(url, headers={"User-Agent": get_random_user_agent()}, timeout=HTTP_TIMEOUT)
+    if response.status_code in THROTTLE_STATUSES:
+        raise ThrottledError(response.status_code)
+    if response.status_code != 200:
+        raise RuntimeError(f"HTTP {response.status_code}")
+    return response.text
+
+THUMBNAILS_LOADED_JS = """
+const pending = [...document.querySelectorAll('.s-item .s-item__image-img')]
+    .find(img => !(img.currentSrc || img.src || '').includes('i.ebayimg.com'));
+if (pending) pending.scrollIntoView({block: 'center'});
+return !pending;
+"""
+
+def render_with_driver(driver, url):
+    driver.get(url)
+    wait = WebDriverWait(driver, 20)
+    wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
+
+    print("📄 Page loaded, scrolling to trigger rendering...")
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
     try:
-        response = requests.get(WIKIDATA_SEARCH_URL, params=params, headers=HEADERS, timeout=10)
-        if response.status_code == 200:
-            results = response.json().get("search", [])
-            if results:
-                top_result = results[0]
-                canonical_name = top_result.get("label", "").strip()
-                if canonical_name:
-                    wikidata_cache[normalized] = canonical_name
-                    print(f"✅ Match: {name} → {canonical_name}")
-                    return canonical_name, 0.75
-    except Exception as e:
-        print(f"❌ Wikidata request failed: {e}")
-
-    wikidata_cache[normalized] = "Unknown"
-    return "Unknown", 0.0
-
-def detect_signer(title):
-    title_lower = title.lower()
-    for name in known_signers:
-        if name in title_lower:
-            return name, 1.0
-    return validate_with_wikidata(title)
+        wait.until(EC.presence_of_element_located((By.CLASS_NAME, "s-item")))
+    except TimeoutException:
+        print("ℹ️ No listing cards rendered — past the last results page?")
+        return driver.page_source  # parses to no listings; not an error
 
-def build_url(query, category_id, page=1):
-    return BASE_SEARCH_URL.format(query=query, category_id=category_id, page=page)
+    # Extra anti-bot measure: simulate slight human behavior
+    driver.execute_script("window.scrollTo(0, 0);")
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight / 2);")
 
-def normalize_listing_url(url):
+    # Lazy-loaded thumbnails only get a real i.ebayimg.com src once they have been scrolled into
+    # view, so bring the next placeholder into view until none are left.
     try:
-        parsed = urlparse(url)
-        clean_path = parsed.path  # strip query params
-        return urlunparse((parsed.scheme, parsed.netloc, clean_path, '', '', ''))
-    except Exception:
-        return url.strip().split('?')[0]
-
-def page_already_scraped(listing_urls, db_path="database/autographs.db"):
-    with sqlite3.connect(db_path) as conn:
-        c = conn.cursor()
-        placeholders = ','.join('?' for _ in listing_urls)
-        c.execute(f"SELECT listing_url FROM autographs WHERE listing_url IN ({placeholders})", listing_urls)
-        found = set(row[0] for row in c.fetchall())
-        return found
+        WebDriverWait(driver, 5).until(lambda d: d.execute_script(THUMBNAILS_LOADED_JS))
+    except TimeoutException:
+        print("⚠️ Thumbnails still loading; parsing what has rendered")
+    return driver.page_source
+
+def save_html_fixture(html, name):
+    os.makedirs(SAVE_HTML_DIR, exist_ok=True)
+    with open(os.path.join(SAVE_HTML_DIR, f"{name}.html"), "w", encoding="utf-8") as f:
+        f.write(html)
+
+def fetch_listings(url, category, fixture_name=None):
+    if FETCH_MODE == "http":
+        try:
+            html = fetch_html(url)
+            data, lazy = parse_listings_page(html, category)
+            if data and not lazy:
+                if SAVE_HTML_DIR and fixture_name:
+                    save_html_fixture(html, fixture_name)
+                return data
+            if lazy:
+                print(f"🧭 {lazy} cards in plain HTML only have placeholder thumbnails — falling back to Chrome")
+            else:
+                print("🧭 No listing cards in plain HTML — falling back to Chrome")
+        except ThrottledError:
+            raise  # being told to slow down; don't retry the same page in a browser
+        except Exception as e:
+            print(f"🧭 HTTP fetch failed ({e}) — falling back to Chrome")
 
-def should_skip_page(listings_on_page):
-    urls = [item['listing_url'] for item in listings_on_page if item['listing_url']]
-    existing = page_already_scraped(urls)
-    return len(existing) == len(urls)
+    with driver_pool.borrow() as driver:
+        html = render_with_driver(driver, url)
+    if SAVE_HTML_DIR and fixture_name:
+        save_html_fixture(html, fixture_name)
+    data, lazy = parse_listings_page(html, category)
+    if lazy:
+        print(f"⚠️ Dropped {lazy} cards whose thumbnails never loaded")
+    return data
 
 def scrape_page(query, category, page, retries=3):
     url = build_url(query, CATEGORY_MAP[category], page)
     print(f"Scraping {category} page {page} — URL: {url}")
 
-    user_agent = get_random_user_agent()
-    print(f"🧠 Using User-Agent: {user_agent}")
-
     for attempt in range(1, retries + 1):
-        driver = None
+        # Retries need no fixed sleep: a failure cuts the host's rate and drains its bucket.
+        pacer.wait(url)
+        started = time.monotonic()
         try:
-            options = uc.ChromeOptions()
-            options = apply_scrape_options(options, proxy=None, user_agent=user_agent)
-            driver = uc.Chrome(version_main=136, options=options)
-            driver.set_page_load_timeout(20)
-            driver.get(url)
-
-            print("📄 Page loaded, attempting to scroll to trigger rendering...")
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(5)
-
-            # Extra anti-bot measure: simulate slight human behavior
-            driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(1)
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight / 2);")
-            time.sleep(1)
-
-            WebDriverWait(driver, 20).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "s-item"))
-            )
-
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-            items = soup.select(".s-item")
-
-            data = []
-            for item in items:
-                title = item.select_one(".s-item__title")
-                price = item.select_one(".s-item__price")
-                link = item.select_one(".s-item__link")
-                img_tag = item.select_one(".s-item__image-img") or item.select_one("img")
-                img_url = img_tag.get("src") if img_tag else None
-
-                if not title or not title.get_text(strip=True): continue
-                if "listing" in title.get_text(strip=True).lower(): continue
-                if not img_url: continue
-
-                signer_name, confidence = detect_signer(title.get_text())
-                data.append({
-                    "title": title.get_text(),
-                    "price": price.get_text() if price else "N/A",
-                    "img_url": img_url,
-                    "listing_url": link["href"] if link else None,
-                    "category": category,
-                    "signer": signer_name,
-                    "confidence": confidence
-                })
-
-            return data
-
+            data = fetch_listings(url, category, fixture_name=f"{category}_p{page}")
         except Exception as e:
-            print(f"❌ Selenium error on attempt {attempt}: {e}")
-            import traceback
-            traceback.print_exc()
+            status = e.status if isinstance(e, ThrottledError) else None
+            rate = pacer.record(url, time.monotonic() - started, ok=False, status=status)
+            print(f"❌ Fetch error on attempt {attempt}: {e} — pacing down to {rate:.1f} pages/min")
+            if not isinstance(e, ThrottledError):
+                import traceback
+                traceback.print_exc()
             if attempt == retries:
                 print("⛔️ Giving up on this page.")
                 return []
-            time.sleep(60)
-
-        finally:
-            if driver:
-                try: driver.quit()
-                except: pass
-
-def scrape_autographs(query=SEARCH_QUERY, categories=list(CATEGORY_MAP.keys())):
-    all_data = []
-    for category in categories:
-        print(f"\n🔎 Starting category: {category}")
-        page = 1
-        consecutive_failures = 0
-        max_consecutive_failures = 3
-
-        while True:
-            if len(all_data) >= MAX_RESULTS:
-                print(f"🚫 Reached max result cap: {MAX_RESULTS}")
-                return all_data[:MAX_RESULTS]
-
-            page_data = scrape_page(query, category, page)
-            if not page_data:
-                consecutive_failures += 1
-                print(f"📉 No listings found or error on page {page}. Failure count: {consecutive_failures}")
-                if consecutive_failures >= max_consecutive_failures:
-                    print(f"📉 No more results for {category} after page {page}.")
-                    break
-            else:
-                consecutive_failures = 0
-                if should_skip_page(page_data):
-                    print(f"⏭️ Skipping page {page} — all listings already known")
-                else:
-                    all_data.extend(page_data)
-                    save_to_db(page_data, run_id)
+            continue
 
-            page += 1
-            time.sleep(30)
+        rate = pacer.record(url, time.monotonic() - started, ok=True, empty=not data)
+        print(f"⏱️ {category} page {page} in {time.monotonic() - started:.1f}s — "
+              f"pacing {rate:.1f} pages/min, effective {pacer.pages_per_minute():.1f}")
 
-    return all_data[:MAX_RESULTS]
+        # One URL per eBay item, whatever slug or tracking parameters the link carried.
+        for item, listing_url in zip(data, canonicalize_many([item["listing_url"] for item in data])):
+            item["listing_url"] = listing_url
+        mark_seen(data)
+        if page_fully_seen(data):
+            return data
+
+        signers = detect_signers([item["title"] for item in data if not item["seen"]])
+        for item in data:
+            if not item["seen"]:
+                item["signer"], item["confidence"] = signers[item["title"]]
+        return data
+
+def scrape_autographs(run_id, query=SEARCH_QUERY, categories=list(CATEGORY_MAP.keys()), checkpoints=None):
+    # Pages go straight to the DB as they arrive; only per-category counters stay in memory.
+    checkpoints = checkpoints or {}
+    results = {c: checkpoints[c]["results"] if c in checkpoints else 0 for c in categories}
+    pending = [c for c in categories if not checkpoints.get(c, {}).get("done")]
+    start_pages = {c: checkpoints[c]["last_page"] + 1 for c in pending if c in checkpoints}
+    for category, page in start_pages.items():
+        print(f"⏩ Resuming {category} at page {page} ({results[category]} results so far)")
+
+    def handle_page(category, page, page_data):
+        new = [item for item in page_data if not item["seen"]]
+        touch_listings([item for item in page_data if item["seen"]], run_id)
+        if not new:
+            print(f"⏭️ Skipping {category} page {page} — all listings already known")
+            return 0
+        save_to_db(new, run_id)
+        seen_urls.add_many(item["listing_url"] for item in new if item["signer"] != "Unknown")
+        fetched_urls.add_many(item["listing_url"] for item in new)
+        results[category] += len(new)
+        return len(new)
+
+    def on_checkpoint(category, last_page, done):
+        save_checkpoint(run_id, category, last_page, results[category], done)
+
+    total = run_page_scheduler(
+        pending,
+        lambda category, page: scrape_page(query, category, page),
+        handle_page,
+        workers=SCRAPE_WORKERS,
+        max_results=MAX_RESULTS,
+        max_consecutive_failures=MAX_CONSECUTIVE_FAILURES,
+        start_pages=start_pages,
+        on_checkpoint=on_checkpoint,
+        initial_total=sum(results.values()),
+        is_seen=page_fully_seen,
+        max_seen_pages=MAX_SEEN_PAGES,
+    )
+    print(f"📈 Pacing: {pacer.summary()}")
+    return total
 
 def init_db():
     if not os.path.exists(DB_PATH):
@@ -252,99 +286,164 @@ def init_db():
     else:
         print("🛡️ Using existing database — no data will be lost")
 
-    with sqlite3.connect(DB_PATH) as conn:
-        c = conn.cursor()
-
-        c.execute('''CREATE TABLE IF NOT EXISTS signers (
-            id INTEGER PRIMARY KEY,
-            full_name TEXT NOT NULL,
-            category TEXT NOT NULL,
-            birth_year INTEGER,
-            active_years TEXT,
-            nationality TEXT,
-            notable_works TEXT,
-            deceased BOOLEAN,
-            UNIQUE(full_name, category))''')
-
-        c.execute('''CREATE TABLE IF NOT EXISTS autographs (
-            id INTEGER PRIMARY KEY,
-            title TEXT,
-            price TEXT,
-            img_url TEXT,
-            listing_url TEXT UNIQUE,
-            category TEXT,
-            signer_id INTEGER,
-            confidence REAL,
-            last_seen TIMESTAMP,
-            run_id INTEGER,
-            FOREIGN KEY (signer_id) REFERENCES signers(id),
-            FOREIGN KEY (run_id) REFERENCES scrape_runs(id))''')
-
-        c.execute('''CREATE TABLE IF NOT EXISTS scrape_runs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            notes TEXT)''')
+    # Tables and indexes are created by the shared migrations in dbHelper.
+    get_connection().close()
 
 def create_scrape_run():
-    with sqlite3.connect(DB_PATH) as conn:
+    with get_connection() as conn:
         c = conn.cursor()
         c.execute("INSERT INTO scrape_runs (notes) VALUES (?)", ("Americana scrape",))
         return c.lastrowid
 
-def get_or_create_signer(conn, name, category):
-    c = conn.cursor()
-    c.execute("SELECT id FROM signers WHERE full_name = ? AND category = ?", (name, category))
-    row = c.fetchone()
-    if row:
+def latest_scrape_run():
+    with get_connection() as conn:
+        row = conn.execute("SELECT MAX(id) FROM scrape_runs").fetchone()
         return row[0]
-    try:
-        c.execute("INSERT INTO signers (full_name, category) VALUES (?, ?)", (name, category))
-        return c.lastrowid
-    except sqlite3.IntegrityError:
-        c.execute("SELECT id FROM signers WHERE full_name = ? AND category = ?", (name, category))
-        return c.fetchone()[0]
-
-def save_to_db(data, run_id):
-    with sqlite3.connect(DB_PATH) as conn:
-        c = conn.cursor()
-        saved = 0
-        now = datetime.now(timezone.utc)
 
-        for item in data:
-            if item["signer"] == "Unknown":
-                continue
-
-            signer_id = get_or_create_signer(conn, item["signer"], item["category"])
-
-            c.execute("SELECT id FROM autographs WHERE listing_url = ?", (item["listing_url"],))
-            existing = c.fetchone()
+def load_checkpoints(run_id):
+    with get_connection() as conn:
+        rows = conn.execute(
+            "SELECT category, last_page, results, done FROM scrape_checkpoints WHERE run_id = ?",
+            (run_id,)).fetchall()
+    return {category: {"last_page": last_page, "results": results, "done": bool(done)}
+            for category, last_page, results, done in rows}
+
+def save_checkpoint(run_id, category, last_page, results, done):
+    with get_connection() as conn:
+        conn.execute('''INSERT INTO scrape_checkpoints (run_id, category, last_page, results, done, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(run_id, category) DO UPDATE SET
+                            last_page = excluded.last_page,
+                            results = excluded.results,
+                            done = excluded.done,
+                            updated_at = excluded.updated_at''',
+                     (run_id, category, last_page, results, done, datetime.now(timezone.utc)))
+
+def resolve_signer_ids(conn, pairs):
+    pairs = sorted(set(pairs))
+    if not pairs:
+        return {}
 
-            if existing:
-                c.execute('''UPDATE autographs
-                             SET last_seen = ?, run_id = ?
-                             WHERE listing_url = ?''',
-                          (now, run_id, item["listing_url"]))
-                continue
-
-            c.execute('''INSERT INTO autographs (
-                            title, price, img_url, listing_url,
-                            category, signer_id, confidence,
-                            last_seen, run_id)
-                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                      (item['title'], item['price'], item['img_url'],
-                       item['listing_url'], item['category'],
-                       signer_id, item['confidence'], now, run_id))
-            saved += 1
+    c = conn.cursor()
+    c.executemany("INSERT OR IGNORE INTO signers (full_name, category) VALUES (?, ?)", pairs)
+
+    placeholders = ','.join('(?, ?)' for _ in pairs)
+    params = [value for pair in pairs for value in pair]
+    c.execute(f"""SELECT full_name, category, id FROM signers
+                  WHERE (full_name, category) IN (VALUES {placeholders})""", params)
+    return {(name, category): signer_id for name, category, signer_id in c.fetchall()}
+
+def record_observations(conn, items, run_id, now):
+    # One sighting per (listing, run) with the price shown this time; autographs keeps only the latest.
+    conn.executemany('''INSERT INTO listing_observations (
+                            autograph_id, run_id, observed_at,
+                            price, price_min, price_max, price_currency)
+                        SELECT id, ?, ?, ?, ?, ?, ? FROM autographs WHERE listing_url = ?
+                        ON CONFLICT(autograph_id, run_id) DO UPDATE SET
+                            observed_at = excluded.observed_at,
+                            price = excluded.price,
+                            price_min = excluded.price_min,
+                            price_max = excluded.price_max,
+                            price_currency = excluded.price_currency''',
+                     [(run_id, now, item['price'], *parse_price(item['price']), item['listing_url'])
+                      for item in items if item['listing_url']])
+
+def touch_listings(items, run_id):
+    # Listings skipped as already known are still live; refresh their price and last_seen.
+    if not items:
+        return
+    now = datetime.now(timezone.utc)
+    with get_connection() as conn:
+        conn.executemany('''UPDATE autographs SET
+                                price = ?, price_min = ?, price_max = ?, price_currency = ?,
+                                last_seen = ?, run_id = ?
+                            WHERE listing_url = ?''',
+                         [(item['price'], *parse_price(item['price']), now, run_id, item['listing_url'])
+                          for item in items])
+        record_observations(conn, items, run_id, now)
 
-        print(f"✅ {saved} new records saved (others updated with last_seen).")
+def save_to_db(data, run_id):
+    # One listing per URL; a repeat later on the same page only refreshes last_seen.
+    rows = {}
+    unkeyed = []
+    for item in data:
+        if item["signer"] == "Unknown":
+            continue
+        if item["listing_url"] is None:
+            unkeyed.append(item)
+        else:
+            rows.setdefault(item["listing_url"], item)
+    items = list(rows.values()) + unkeyed
+    if not items:
+        print("✅ 0 new records saved, 0 updated with last_seen and price.")
+        return 0, 0
+
+    now = datetime.now(timezone.utc)
+    with get_connection() as conn:
+        c = conn.cursor()
+        signer_ids = resolve_signer_ids(conn, [(item["signer"], item["category"]) for item in items])
+
+        urls = list(rows)
+        existing = set()
+        if urls:
+            placeholders = ','.join('?' for _ in urls)
+            c.execute(f"SELECT listing_url FROM autographs WHERE listing_url IN ({placeholders})", urls)
+            existing = {row[0] for row in c.fetchall()}
+
+        c.executemany('''INSERT INTO autographs (
+                            title, price, price_min, price_max, price_currency,
+                            img_url, listing_url, category, signer_id,
+                            confidence, last_seen, run_id)
+                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                         ON CONFLICT(listing_url) DO UPDATE SET
+                            price = excluded.price,
+                            price_min = excluded.price_min,
+                            price_max = excluded.price_max,
+                            price_currency = excluded.price_currency,
+                            last_seen = excluded.last_seen,
+                            run_id = excluded.run_id''',
+                      [(item['title'], item['price'], *parse_price(item['price']), item['img_url'],
+                        item['listing_url'], item['category'],
+                        signer_ids[(item['signer'], item['category'])],
+                        item['confidence'], now, run_id)
+                       for item in items])
+        record_observations(conn, items, run_id, now)
+
+    updated = len(existing)
+    inserted = len(items) - updated
+    print(f"✅ {inserted} new records saved, {updated} updated with last_seen and price.")
+    return inserted, updated
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape eBay autograph listings")
+    parser.add_argument("--resume", nargs="?", const="latest", metavar="RUN_ID",
+                        help="continue a previous run from its checkpoints (default: the latest run)")
+    args = parser.parse_args()
+
     init_db()
-    run_id = create_scrape_run()
-    data = scrape_autographs()
-    save_to_db(data, run_id)
+    with get_connection() as conn:
+        seen_urls.load(conn)
+        fetched_urls.load(conn)
+
+    if args.resume:
+        run_id = latest_scrape_run() if args.resume == "latest" else int(args.resume)
+        if run_id is None:
+            print("❌ No previous scrape run to resume.")
+            sys.exit(1)
+        checkpoints = load_checkpoints(run_id)
+        print(f"🔁 Resuming scrape run {run_id}")
+    else:
+        run_id = create_scrape_run()
+        checkpoints = {}
+        print(f"🆕 Started scrape run {run_id}")
 
-    with open(CACHE_FILE, "w", encoding="utf-8") as f:
-        json.dump(wikidata_cache, f, indent=2, ensure_ascii=False)
+    try:
+        total = scrape_autographs(run_id, checkpoints=checkpoints)
+        print(f"📦 {total} listings saved for run {run_id}")
+    finally:
+        driver_pool.close()
+        with get_connection() as conn:
+            seen_urls.save(conn)
+            fetched_urls.save(conn)
 
     print("All done!")
@@ -0,0 +1,172 @@
+# listingParser.py — eBay search results HTML -> listing records
+#
+# parse_listings() is a pure function so it can be benchmarked offline against saved pages
+# (see scripts/debug/benchmark_listing_parser.py). It uses the fastest parser installed:
+# selectolax (Lexbor, C), then lxml (libxml2, C), then BeautifulSoup as the reference.
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+
+# A card whose thumbnail hasn't been swapped in yet (raw HTML, or a render that wasn't scrolled
+# far enough). It carries no usable image URL, so parse_listings_page reports it separately.
+LAZY_IMAGE = object()
+
+
+def is_placeholder(url):
+    """eBay's 1x2 spacer GIF and inline data: URIs stand in for thumbnails until they load."""
+    url = url.strip().lower()
+    return url.startswith("data:") or "ebaystatic.com/" in url or url.split("?")[0].endswith(".gif")
+
+
+def image_url(get):
+    """Best thumbnail URL from an <img> attribute getter: data-src, then srcset, then src."""
+    first_srcset = (get("srcset") or "").split(",")[0].split()
+    candidates = [get("data-src"), first_srcset[0] if first_srcset else None, get("src")]
+    for url in candidates:
+        if url and not is_placeholder(url):
+            return url
+    return LAZY_IMAGE if any(candidates) else None
+
+
+def make_record(category, title, price, img_url, listing_url):
+    # Same filtering as the original BeautifulSoup loop in scrape_page.
+    if not title or not title.strip():
+        return None
+    if "listing" in title.strip().lower():
+        return None
+    if not img_url:
+        return None
+    if img_url is LAZY_IMAGE:
+        return LAZY_IMAGE
+    return {
+        "title": title,
+        "price": price if price is not None else "N/A",
+        "img_url": img_url,
+        "listing_url": listing_url,
+        "category": category
+    }
+
+
+def parse_selectolax(html, category=None):
+    tree = LexborHTMLParser(html)
+    data = []
+    for item in tree.css(".s-item"):
+        title = item.css_first(".s-item__title")
+        price = item.css_first(".s-item__price")
+        link = item.css_first(".s-item__link")
+        img_tag = item.css_first(".s-item__image-img") or item.css_first("img")
+
+        record = make_record(
+            category,
+            title.text() if title else None,
+            price.text() if price else None,
+            image_url(img_tag.attributes.get) if img_tag else None,
+            link.attributes.get("href") if link else None,
+        )
+        if record:
+            data.append(record)
+    return data
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+_LXML_ITEM = f"//*[{_has_class('s-item')}]"
+_LXML_FIELDS = {
+    field: f".//*[{_has_class(cls)}]"
+    for field, cls in [
+        ("title", "s-item__title"),
+        ("price", "s-item__price"),
+        ("link", "s-item__link"),
+        ("img", "s-item__image-img"),
+    ]
+}
+
+
+def parse_lxml(html, category=None):
+    tree = lxml.html.fromstring(html)
+
+    def first(item, field):
+        found = item.xpath(_LXML_FIELDS[field])
+        return found[0] if found else None
+
+    data = []
+    for item in tree.xpath(_LXML_ITEM):
+        title = first(item, "title")
+        price = first(item, "price")
+        link = first(item, "link")
+        img_tag = first(item, "img")
+        if img_tag is None:
+            imgs = item.xpath(".//img")
+            img_tag = imgs[0] if imgs else None
+
+        record = make_record(
+            category,
+            "".join(title.itertext()) if title is not None else None,
+            "".join(price.itertext()) if price is not None else None,
+            image_url(img_tag.get) if img_tag is not None else None,
+            link.get("href") if link is not None else None,
+        )
+        if record:
+            data.append(record)
+    return data
+
+
+def parse_bs4(html, category=None):
+    soup = BeautifulSoup(html, "html.parser")
+    data = []
+    for item in soup.select(".s-item"):
+        title = item.select_one(".s-item__title")
+        price = item.select_one(".s-item__price")
+        link = item.select_one(".s-item__link")
+        img_tag = item.select_one(".s-item__image-img") or item.select_one("img")
+
+        record = make_record(
+            category,
+            title.get_text() if title else None,
+            price.get_text() if price else None,
+            image_url(img_tag.get) if img_tag else None,
+            link.get("href") if link else None,
+        )
+        if record:
+            data.append(record)
+    return data
+
+
+PARSERS = {}
+if LexborHTMLParser is not None:
+    PARSERS["selectolax"] = parse_selectolax
+if lxml is not None:
+    PARSERS["lxml"] = parse_lxml
+if BeautifulSoup is not None:
+    PARSERS["bs4"] = parse_bs4
+
+if not PARSERS:
+    raise ImportError("listingParser needs selectolax, lxml or beautifulsoup4 installed")
+
+DEFAULT_PARSER = next(iter(PARSERS))
+
+
+def parse_listings_page(html, category=None, parser=None):
+    """(records, lazy) — lazy counts cards dropped because their thumbnail was still a placeholder."""
+    parsed = PARSERS[parser or DEFAULT_PARSER](html, category)
+    records = [record for record in parsed if record is not LAZY_IMAGE]
+    return records, len(parsed) - len(records)
+
+
+def parse_listings(html, category=None, parser=None):
+    return parse_listings_page(html, category, parser)[0]
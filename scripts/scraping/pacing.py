@@ -0,0 +1,74 @@
+# pacing.py — AIMD pacing on top of the per-host token buckets
+import threading
+import time
+from collections import deque
+
+# Statuses that mean "slow down" rather than "this page is broken".
+THROTTLE_STATUSES = {403, 429, 503}
+
+
+class ThrottledError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status} (throttled)")
+        self.status = status
+
+
+class AdaptivePacer:
+    """
+    Adjusts each host's token-bucket rate from what the pages tell us:
+    every fast, successful page adds `increase` pages/min (additive increase),
+    an error or throttling status multiplies the rate by `decrease` and drains the
+    bucket (multiplicative decrease), and a slow response backs off gently. An empty
+    page (past the last results page) leaves the rate alone. Also tracks effective
+    pages per minute.
+    """
+
+    def __init__(self, limiter, min_per_minute=2, max_per_minute=30, increase=1.0,
+                 decrease=0.5, slow_decrease=0.85, slow_seconds=10.0, window=20):
+        self.limiter = limiter
+        self.min_rate = min_per_minute / 60
+        self.max_rate = max_per_minute / 60
+        self.increase = increase / 60
+        self.decrease = decrease
+        self.slow_decrease = slow_decrease
+        self.slow_seconds = slow_seconds
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._recent = deque(maxlen=window)  # completion times of successful pages
+        self.pages = 0
+        self.errors = 0
+
+    def wait(self, url):
+        self.limiter.acquire(url)
+
+    def record(self, url, elapsed, ok, status=None, empty=False):
+        bucket = self.limiter.bucket(url)
+        with self._lock:
+            if not ok or status in THROTTLE_STATUSES:
+                self.errors += 1
+                bucket.set_rate(max(self.min_rate, bucket.rate * self.decrease), drain=True)
+            elif empty:
+                pass  # says nothing about congestion, and its time is mostly the render wait
+            elif elapsed > self.slow_seconds:
+                bucket.set_rate(max(self.min_rate, bucket.rate * self.slow_decrease))
+            else:
+                bucket.set_rate(min(self.max_rate, bucket.rate + self.increase))
+
+            if ok:
+                self.pages += 1
+                self._recent.append(time.monotonic())
+            return bucket.rate * 60
+
+    def pages_per_minute(self):
+        with self._lock:
+            if len(self._recent) >= 2:
+                span = self._recent[-1] - self._recent[0]
+                if span > 0:
+                    return (len(self._recent) - 1) / span * 60
+            elapsed = time.monotonic() - self._started
+            return self.pages / elapsed * 60 if elapsed > 0 else 0.0
+
+    def summary(self):
+        elapsed = time.monotonic() - self._started
+        overall = self.pages / elapsed * 60 if elapsed > 0 else 0.0
+        return f"{self.pages} pages, {self.errors} errors, {overall:.1f} pages/min overall"
@@ -0,0 +1,120 @@
+# scrapeScheduler.py
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class CategoryProgress:
+    def __init__(self, name, start_page=1, max_consecutive_failures=3, max_seen_pages=None):
+        self.name = name
+        self.next_page = start_page
+        self.last_success = start_page - 1
+        self.max_consecutive_failures = max_consecutive_failures
+        self.max_seen_pages = max_seen_pages
+        self.seen_pages = set()  # pages whose listings were all saved on earlier runs
+        self.outcomes = {}  # page -> True if the page returned listings
+        self.checkpoint = start_page - 1  # every page up to here has been handled
+        self.in_flight = 0
+        self.done = False
+        self.stopped_early = False
+
+    def record(self, page, ok, seen=False):
+        self.outcomes[page] = ok
+        if ok and page > self.last_success:
+            self.last_success = page
+        while self.checkpoint + 1 in self.outcomes:
+            self.checkpoint += 1
+
+        # End of results: the pages right after the last good one all came back empty.
+        window = range(self.last_success + 1, self.last_success + 1 + self.max_consecutive_failures)
+        if all(self.outcomes.get(p) is False for p in window):
+            self.done = True
+
+        # Caught up with earlier runs: enough pages in a row had nothing new.
+        if seen and self.max_seen_pages:
+            self.seen_pages.add(page)
+            first = last = page
+            while first - 1 in self.seen_pages:
+                first -= 1
+            while last + 1 in self.seen_pages:
+                last += 1
+            if last - first + 1 >= self.max_seen_pages:
+                self.stopped_early = not self.done
+                self.done = True
+
+    def can_dispatch(self, lookahead):
+        return not self.done and self.next_page <= self.last_success + lookahead
+
+
+def run_page_scheduler(categories, fetch_page, handle_page, workers=3,
+                       max_results=None, max_consecutive_failures=3, start_pages=None,
+                       on_checkpoint=None, initial_total=0, is_seen=None, max_seen_pages=None):
+    """
+    Fetches pages for several categories in parallel.
+
+    fetch_page(category, page) runs on a worker thread and returns the page's listings.
+    handle_page(category, page, listings) runs on the calling thread, one page at a time,
+    and returns how many results it kept towards `max_results`.
+    on_checkpoint(category, last_page, done) runs after handle_page whenever the highest
+    page with every earlier page handled moves forward, so a restart can resume after it.
+    is_seen(listings) marks a page as already known; a category stops once
+    `max_seen_pages` consecutive pages are.
+    """
+    start_pages = start_pages or {}
+    progress = [
+        CategoryProgress(c, start_pages.get(c, 1), max_consecutive_failures, max_seen_pages)
+        for c in categories
+    ]
+    # How far past the last good page a category may speculatively fetch.
+    lookahead = max(max_consecutive_failures, workers)
+    total = initial_total
+    capped = max_results is not None and total >= max_results
+    pending = {}
+
+    def dispatch(executor):
+        while len(pending) < workers and not capped:
+            ready = [p for p in progress if p.can_dispatch(lookahead)]
+            if not ready:
+                return
+            # Spread workers across categories: least busy first, then lowest page.
+            state = min(ready, key=lambda p: (p.in_flight, p.next_page))
+            page = state.next_page
+            state.next_page += 1
+            state.in_flight += 1
+            pending[executor.submit(fetch_page, state.name, page)] = (state, page)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        dispatch(executor)
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                state, page = pending.pop(future)
+                state.in_flight -= 1
+                before = (state.checkpoint, state.done)
+                try:
+                    listings = future.result()
+                except Exception as e:
+                    print(f"❌ Worker failed on {state.name} page {page}: {e}")
+                    listings = []
+
+                if not listings:
+                    print(f"📉 No listings found or error on {state.name} page {page}.")
+                    state.record(page, False)
+                    if state.done and not before[1]:
+                        print(f"📉 No more results for {state.name} after page {state.last_success}.")
+                elif not capped:
+                    total += handle_page(state.name, page, listings)
+                    state.record(page, True, seen=bool(is_seen and is_seen(listings)))
+                    if state.stopped_early and not before[1]:
+                        print(f"⏹️ {state.name}: {max_seen_pages} pages in a row already scraped — stopping early.")
+                    if max_results is not None and total >= max_results:
+                        print(f"🚫 Reached max result cap: {max_results}")
+                        capped = True
+                else:
+                    # Fetched after the cap was hit; nothing was saved, so don't checkpoint past it.
+                    continue
+
+                if on_checkpoint and (state.checkpoint, state.done) != before:
+                    on_checkpoint(state.name, state.checkpoint, state.done)
+
+            dispatch(executor)
+
+    return total
@@ -0,0 +1,132 @@
+# seenUrls.py — persisted bloom filters of listing URLs earlier runs already handled
+import hashlib
+import math
+import os
+import struct
+
+from listingUrl import canonical_listing_url
+
+HEADER = struct.Struct("<4sIIQQQQ")  # magic, version, hashes, bits, capacity, count, watermark
+MAGIC = b"SEEN"
+VERSION = 2  # bump when the URL normalization changes so old filters get rebuilt
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # Double hashing: k positions from two 64-bit halves of one digest.
+        h1, h2 = struct.unpack("<QQ", hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest())
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        new = False
+        for pos in self._positions(key):
+            mask = 1 << (pos & 7)
+            if not self.bits[pos >> 3] & mask:
+                self.bits[pos >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class SeenUrls:
+    """
+    Canonical listing URLs kept in a bloom filter so each page can be checked in memory.
+    With from_db=True the filter mirrors `autographs.listing_url`: the file records the
+    highest autographs.id it covers and loading catches up on newer rows, so a crashed run
+    loses nothing. With from_db=False it only holds what was added with add_many(), e.g.
+    every fetched listing including the ones never saved. A false positive only makes one
+    listing look known; a page is skipped when all of them do.
+    """
+
+    def __init__(self, path, normalize=canonical_listing_url, capacity=200000, error_rate=0.0001, from_db=True):
+        self.path = path
+        self.normalize = normalize
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.from_db = from_db
+        self.bloom = None
+        self.watermark = 0
+
+    def _read(self):
+        with open(self.path, "rb") as f:
+            magic, version, hashes, size, capacity, count, watermark = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("not a seen-URL filter file")
+            bits = bytearray(f.read())
+        if len(bits) != (size + 7) // 8:
+            raise ValueError("truncated filter file")
+
+        bloom = BloomFilter.__new__(BloomFilter)
+        bloom.size, bloom.hashes, bloom.capacity, bloom.count, bloom.bits = size, hashes, capacity, count, bits
+        return bloom, watermark
+
+    def _add_rows(self, conn, after_id):
+        if not self.from_db:
+            return after_id
+        watermark = after_id
+        for row_id, url in conn.execute(
+                "SELECT id, listing_url FROM autographs WHERE id > ? AND listing_url IS NOT NULL ORDER BY id",
+                (after_id,)):
+            self.bloom.add(self.normalize(url))
+            watermark = row_id
+        return watermark
+
+    def load(self, conn):
+        if os.path.exists(self.path):
+            try:
+                self.bloom, self.watermark = self._read()
+            except Exception as e:
+                print(f"⚠️ Could not load seen-URL filter, rebuilding: {e}")
+                self.bloom = None
+
+        if self.from_db:
+            total = conn.execute("SELECT COUNT(*) FROM autographs").fetchone()[0]
+        else:
+            # Nothing to rebuild from; an outgrown filter starts over rather than drift into false positives.
+            total = self.bloom.count if self.bloom else 0
+            if total > self.capacity:
+                print(f"⚠️ {os.path.basename(self.path)} holds {total} URLs (capacity {self.capacity}); starting over")
+                self.bloom = None
+                total = 0
+        if self.bloom is None or total > self.bloom.capacity:
+            # Missing, corrupt or outgrown: rebuild with headroom so the error rate holds.
+            self.bloom = BloomFilter(max(self.capacity, total * 2), self.error_rate)
+            self.watermark = 0
+            if self.from_db:
+                print(f"🔧 Building seen-URL filter from {total} saved listings...")
+
+        before = self.bloom.count
+        self.watermark = self._add_rows(conn, self.watermark)
+        caught_up = f" ({self.bloom.count - before} added from the DB)" if self.from_db else ""
+        print(f"⚡ {os.path.basename(self.path)} ready: {self.bloom.count} URLs{caught_up}")
+        return self
+
+    def __contains__(self, url):
+        return bool(url) and self.normalize(url) in self.bloom
+
+    def add_many(self, urls):
+        for url in urls:
+            if url:
+                self.bloom.add(self.normalize(url))
+
+    def save(self, conn):
+        # Rows added this run are already in the filter; catch up on anything else first.
+        self.watermark = self._add_rows(conn, self.watermark)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.bloom.hashes, self.bloom.size,
+                                self.bloom.capacity, self.bloom.count, self.watermark))
+            f.write(self.bloom.bits)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,126 @@
+# signerMatcher.py
+import hashlib
+import os
+import pickle
+import re
+from collections import deque
+
+MATCHER_VERSION = 1
+
+
+def normalize_tokens(text):
+    return re.sub(r'\W+', ' ', text).strip().lower().split()
+
+
+def fingerprint_names(names):
+    digest = hashlib.sha1()
+    for name in sorted(names):
+        digest.update(name.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+class SignerMatcher:
+    """
+    Aho-Corasick automaton over normalized name tokens.
+    Finds every known signer in a title with a single pass over its tokens.
+    """
+
+    def __init__(self, names):
+        self.fingerprint = fingerprint_names(names)
+        self.names = []        # pattern id -> original signer name
+        self.lengths = []      # pattern id -> (token count, char length)
+        self.goto = [{}]       # state -> {token: state}
+        self.fail = [0]
+        self.output = [-1]     # state -> pattern id ending exactly here
+        self.dict_link = [0]   # state -> nearest suffix state with an output
+
+        for name in sorted(names):
+            tokens = normalize_tokens(name)
+            if tokens:
+                self._add(name, tokens)
+        self._link()
+
+    def _add(self, name, tokens):
+        state = 0
+        for token in tokens:
+            nxt = self.goto[state].get(token)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][token] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(-1)
+                self.dict_link.append(0)
+            state = nxt
+
+        # Names are added in sorted order, so the first one to claim a state
+        # is the alphabetically smallest spelling of that token sequence.
+        if self.output[state] == -1:
+            self.output[state] = len(self.names)
+            self.names.append(name)
+            self.lengths.append((len(tokens), len(" ".join(tokens))))
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and token not in self.goto[f]:
+                    f = self.fail[f]
+                fail_state = self.goto[f].get(token, 0)
+                self.fail[nxt] = fail_state
+                self.dict_link[nxt] = fail_state if self.output[fail_state] != -1 else self.dict_link[fail_state]
+
+    def find_all(self, text):
+        """Returns (start_token, end_token, name) for every signer in the text."""
+        matches = []
+        state = 0
+        for i, token in enumerate(normalize_tokens(text)):
+            while state and token not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(token, 0)
+
+            hit = state if self.output[state] != -1 else self.dict_link[state]
+            while hit:
+                pid = self.output[hit]
+                matches.append((i + 1 - self.lengths[pid][0], i + 1, self.names[pid]))
+                hit = self.dict_link[hit]
+        return matches
+
+    def best_match(self, text):
+        """Longest match wins (tokens, then characters); ties go to the earliest, then alphabetical."""
+        best = None
+        best_key = None
+        for start, end, name in self.find_all(text):
+            token_count = end - start
+            key = (-token_count, -len(name), start, name)
+            if best_key is None or key < best_key:
+                best, best_key = name, key
+        return best
+
+
+def load_or_build_matcher(names, path):
+    fingerprint = fingerprint_names(names)
+
+    if os.path.exists(path):
+        try:
+            with open(path, "rb") as f:
+                version, matcher = pickle.load(f)
+            if version == MATCHER_VERSION and matcher.fingerprint == fingerprint:
+                print(f"⚡ Loaded signer matcher ({len(matcher.names)} names) from {path}")
+                return matcher
+        except Exception as e:
+            print(f"⚠️ Could not load signer matcher, rebuilding: {e}")
+
+    print(f"🔧 Building signer matcher for {len(names)} names...")
+    matcher = SignerMatcher(names)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump((MATCHER_VERSION, matcher), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return matcher
@@ -0,0 +1,54 @@
+import json
+import os
+
+import pytest
+
+from listingParser import LAZY_IMAGE, PARSERS, image_url, is_placeholder, parse_listings_page
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "fixtures", "ebay")
+FIXTURES = sorted(f[:-len(".expected.json")] for f in os.listdir(FIXTURE_DIR) if f.endswith(".expected.json"))
+CHECKED_FIELDS = ("title", "price", "img_url", "listing_url")
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name + ".html"), "r", encoding="utf-8") as f:
+        html = f.read()
+    with open(os.path.join(FIXTURE_DIR, name + ".expected.json"), "r", encoding="utf-8") as f:
+        return html, json.load(f)
+
+
+@pytest.mark.parametrize("parser", sorted(PARSERS))
+@pytest.mark.parametrize("fixture", FIXTURES)
+def test_parsers_match_expected_records(parser, fixture):
+    html, expected = load_fixture(fixture)
+    records, lazy = parse_listings_page(html, category="sports", parser=parser)
+    assert [{field: r[field] for field in CHECKED_FIELDS} for r in records] == expected["listings"]
+    assert lazy == expected.get("lazy", 0)
+    assert all(r["category"] == "sports" for r in records)
+
+
+def test_fixtures_are_present():
+    assert "search_results" in FIXTURES
+
+
+@pytest.mark.parametrize("url", [
+    "data:image/gif;base64,R0lGODlhAQABAAAAACw=",
+    "https://ir.ebaystatic.com/cr/v/c01/s_1x2.gif",
+    "https://i.ebayimg.com/images/g/spacer.GIF?set_id=1",
+])
+def test_placeholders(url):
+    assert is_placeholder(url)
+
+
+def test_real_thumbnail_is_not_a_placeholder():
+    assert not is_placeholder("https://i.ebayimg.com/thumbs/images/g/AAAA/s-l225.jpg")
+
+
+def test_image_url_prefers_data_src_then_srcset_then_src():
+    real = "https://i.ebayimg.com/thumbs/images/g/AAAA/s-l225.jpg"
+    spacer = "https://ir.ebaystatic.com/cr/v/c01/s_1x2.gif"
+    assert image_url({"data-src": real, "src": spacer}.get) == real
+    assert image_url({"srcset": f"{real} 1x, https://i.ebayimg.com/b.jpg 2x", "src": spacer}.get) == real
+    assert image_url({"src": real}.get) == real
+    assert image_url({"src": spacer}.get) is LAZY_IMAGE
+    assert image_url({}.get) is None
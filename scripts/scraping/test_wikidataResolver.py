@@ -0,0 +1,29 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+
+from wikidataResolver import extract_name_spans
+
+
+def test_ampersand_and_slash_end_a_name():
+    assert extract_name_spans("Derek Jeter & Mariano Rivera Signed Baseball") == ["Derek Jeter", "Mariano Rivera"]
+    assert extract_name_spans("Derek Jeter / Mariano Rivera") == ["Derek Jeter", "Mariano Rivera"]
+    assert extract_name_spans("Derek Jeter and Mariano Rivera") == ["Derek Jeter", "Mariano Rivera"]
+    assert "Jeter Mariano" not in extract_name_spans("Derek Jeter & Mariano Rivera")
+
+
+def test_trailing_name_survives_the_cap():
+    title = "Michael Jordan Chicago Bulls Upper Deck Signed Photo w/ Scottie Pippen"
+    spans = extract_name_spans(title, max_spans=3)
+    assert "Michael Jordan" in spans or "Michael Jordan Chicago" in spans
+    assert "Scottie Pippen" in spans
+
+    spans = extract_name_spans("Michael Jordan Chicago Bulls Upper Deck Scottie Pippen")
+    assert "Michael Jordan" in spans and "Scottie Pippen" in spans
+
+
+def test_three_word_names_and_no_candidates():
+    assert extract_name_spans("KEN GRIFFEY JR Signed Ball") == ["Ken Griffey Jr", "Ken Griffey", "Griffey Jr"]
+    assert extract_name_spans("Signed Baseball PSA DNA") == []
+    assert extract_name_spans("") == []
@@ -0,0 +1,216 @@
+# wikidataResolver.py — batched WikiData lookups for listing titles with no known signer
+import re
+import threading
+import time
+
+import requests
+
+from dbHelper import get_connection
+
+WIKIDATA_API_URL = "https://www.wikidata.org/w/api.php"
+SPARQL_ENDPOINT = "https://query.wikidata.org/sparql"
+HEADERS = {"User-Agent": "AutographReaderBot/1.0 (mailto:your-email@example.com)"}
+
+WIKIDATA_CONFIDENCE = 0.75
+BATCH_SIZE = 50              # wbgetentities accepts up to 50 titles per call
+MAX_SPANS_PER_TITLE = 6
+POSITIVE_TTL = 30 * 86400    # seconds
+NEGATIVE_TTL = 3 * 86400
+MAX_CACHE_ENTRIES = 50000
+
+# Listing words that are never part of a signer's name.
+STOPWORDS = {
+    "a", "an", "and", "the", "of", "with", "w", "in", "on", "for", "by", "to", "from",
+    "signed", "sign", "autograph", "autographed", "autographs", "auto", "autos", "hand", "inscribed",
+    "coa", "psa", "dna", "jsa", "bas", "beckett", "fanatics", "steiner", "mlb", "nfl", "nba", "nhl",
+    "authentic", "authenticated", "certified", "cert", "hologram", "holo", "loa", "witnessed",
+    "card", "cards", "photo", "photograph", "picture", "poster", "ball", "baseball", "football",
+    "basketball", "hockey", "puck", "jersey", "helmet", "bat", "glove", "mini", "full", "size",
+    "framed", "matted", "rookie", "rc", "hof", "game", "used", "team", "official", "vintage",
+    "rare", "new", "lot", "set", "mint", "gem", "x", "hall", "fame", "inscription", "custom",
+}
+
+
+def title_case(word):
+    return word.capitalize() if word.isupper() else word[0].upper() + word[1:]
+
+
+def run_spans(run):
+    """A run's 2–3 word spans, alternating from its start and its end, where names usually sit."""
+    n = len(run)
+    front = [(start, size) for start in range(n - 1) for size in (3, 2) if start + size <= n]
+    back = [(end - size, size) for end in range(n, 1, -1) for size in (3, 2) if end - size >= 0]
+    spans = []
+    for start, size in (pair for pairs in zip(front, back) for pair in pairs):
+        span = " ".join(run[start:start + size])
+        if span not in spans:
+            spans.append(span)
+    return spans
+
+
+def extract_name_spans(title, max_spans=MAX_SPANS_PER_TITLE):
+    """
+    Candidate 2–3 word name spans, taken from runs of non-stopword alphabetic tokens. "&", "/",
+    "+", "," and "|" end a run like "and" does, so "Smith & Jones" never yields a span across both.
+    Runs take turns filling the cap, so a name late in a long title still gets looked up.
+    """
+    runs = [[]]
+    for token in re.findall(r"[A-Za-z.'\-]+|[&/+,|]", title):
+        token = token.strip("'-").lstrip(".")
+        if len(token) < 2 or token.lower() in STOPWORDS:
+            if runs[-1]:
+                runs.append([])
+            continue
+        runs[-1].append(title_case(token))
+
+    per_run = [run_spans(run) for run in runs]
+    spans = []
+    for turn in range(max(len(r) for r in per_run)):
+        for candidates in per_run:
+            if turn < len(candidates) and candidates[turn] not in spans:
+                spans.append(candidates[turn])
+    return spans[:max_spans]
+
+
+class WikidataResolver:
+    """
+    Resolves titles to signer names with batched wbgetentities lookups on
+    candidate name spans, confirming matches are humans with one SPARQL query
+    per batch. Results are cached in SQLite with separate TTLs for hits and
+    misses, trimmed least-recently-used first, and written as they arrive.
+    """
+
+    def __init__(self, db_path=None, timeout=10):
+        self.db_path = db_path
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        self._local = threading.local()
+
+    def _conn(self):
+        # sqlite3 connections are per-thread; scrape workers each get their own.
+        if not hasattr(self._local, "conn"):
+            self._local.conn = get_connection(self.db_path) if self.db_path else get_connection()
+        return self._local.conn
+
+    def _cached(self, spans):
+        conn = self._conn()
+        now = time.time()
+        found = {}
+        for start in range(0, len(spans), 500):
+            chunk = spans[start:start + 500]
+            placeholders = ','.join('?' for _ in chunk)
+            rows = conn.execute(
+                f"SELECT key, label, expires_at FROM wikidata_cache WHERE key IN ({placeholders})",
+                [span.lower() for span in chunk],
+            ).fetchall()
+            for key, label, expires_at in rows:
+                if expires_at > now:
+                    found[key] = label
+
+        if found:
+            conn.executemany("UPDATE wikidata_cache SET last_used = ? WHERE key = ?",
+                             [(now, key) for key in found])
+            conn.commit()
+        return found
+
+    def _store(self, results):
+        conn = self._conn()
+        now = time.time()
+        conn.executemany(
+            '''INSERT INTO wikidata_cache (key, label, qid, expires_at, last_used) VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(key) DO UPDATE SET
+                   label = excluded.label,
+                   qid = excluded.qid,
+                   expires_at = excluded.expires_at,
+                   last_used = excluded.last_used''',
+            [(span.lower(), label, qid, now + (POSITIVE_TTL if label else NEGATIVE_TTL), now)
+             for span, (qid, label) in results.items()],
+        )
+        self._evict(conn)
+        conn.commit()
+
+    def _evict(self, conn):
+        count = conn.execute("SELECT COUNT(*) FROM wikidata_cache").fetchone()[0]
+        if count > MAX_CACHE_ENTRIES:
+            conn.execute(
+                '''DELETE FROM wikidata_cache WHERE key IN (
+                       SELECT key FROM wikidata_cache ORDER BY last_used LIMIT ?)''',
+                (count - MAX_CACHE_ENTRIES,),
+            )
+
+    def _lookup_titles(self, spans):
+        """enwiki titles -> {span: (qid, label)} for spans that have an item."""
+        response = self.session.get(WIKIDATA_API_URL, params={
+            "action": "wbgetentities",
+            "format": "json",
+            "sites": "enwiki",
+            "titles": "|".join(spans),
+            "props": "labels|sitelinks",
+            "languages": "en",
+            "sitefilter": "enwiki",
+            "redirects": "no",
+        }, timeout=self.timeout)
+        response.raise_for_status()
+
+        found = {}
+        for qid, entity in response.json().get("entities", {}).items():
+            if "missing" in entity:
+                continue
+            title = entity.get("sitelinks", {}).get("enwiki", {}).get("title")
+            label = entity.get("labels", {}).get("en", {}).get("value") or title
+            if title:
+                found[title] = (qid, label)
+        return found
+
+    def _humans(self, qids):
+        if not qids:
+            return set()
+        values = " ".join(f"wd:{qid}" for qid in qids)
+        response = self.session.get(SPARQL_ENDPOINT, params={
+            "query": f"SELECT ?item WHERE {{ VALUES ?item {{ {values} }} ?item wdt:P31 wd:Q5 }}",
+            "format": "json",
+        }, timeout=self.timeout)
+        response.raise_for_status()
+        return {
+            item["item"]["value"].rsplit("/", 1)[-1]
+            for item in response.json()["results"]["bindings"]
+        }
+
+    def _fetch(self, spans):
+        fetched = {}
+        for start in range(0, len(spans), BATCH_SIZE):
+            batch = spans[start:start + BATCH_SIZE]
+            try:
+                found = self._lookup_titles(batch)
+                humans = self._humans(sorted({qid for qid, _ in found.values()}))
+            except Exception as e:
+                # Leave the batch uncached so it is retried next time.
+                print(f"❌ Wikidata batch lookup failed: {e}")
+                continue
+
+            results = {}
+            for span in batch:
+                qid, label = found.get(span, (None, None))
+                results[span] = (qid, label) if qid in humans else (None, None)
+            self._store(results)
+            fetched.update({span.lower(): label for span, (_, label) in results.items()})
+        return fetched
+
+    def resolve_many(self, titles):
+        """Returns {title: (signer name or "Unknown", confidence)}."""
+        spans_by_title = {title: extract_name_spans(title) for title in titles}
+        all_spans = list(dict.fromkeys(span for spans in spans_by_title.values() for span in spans))
+
+        labels = self._cached(all_spans)
+        missing = [span for span in all_spans if span.lower() not in labels]
+        if missing:
+            print(f"🔎 Looking up {len(missing)} name candidates on Wikidata ({len(all_spans) - len(missing)} cached)")
+            labels.update(self._fetch(missing))
+
+        resolved = {}
+        for title, spans in spans_by_title.items():
+            # Spans are ordered longest-first within each run, so the first hit is the best one.
+            hit = next((labels[s.lower()] for s in spans if labels.get(s.lower())), None)
+            resolved[title] = (hit, WIKIDATA_CONFIDENCE) if hit else ("Unknown", 0.0)
+        return resolved